@@ -0,0 +1,231 @@
+"""
+Offline benchmark for the music analysis hot path.
+
+Runs descriptor extraction (BPM and quality metrics) and genre scoring on
+synthetic fixtures across track lengths and sample rates, and records wall
+time, peak RSS and accuracy for each case as JSON. Genre fixtures are fitted
+to the scorer's prototypes, so the genre case reports how well each fixture
+still lands on its prototype (a calibration check), not classifier accuracy.
+
+    python -m benchmarks.bench_music_analysis --output bench_output.json
+    python -m benchmarks.bench_music_analysis --compare bench_output.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.fixtures import GENRE_FIXTURES, click_track, genre_like, shaped_noise
+
+LENGTHS = (10.0, 30.0, 120.0)
+SAMPLE_RATES = (22050, 44100)
+BPMS = (85.0, 120.0, 150.0)
+GENRES = tuple(GENRE_FIXTURES)
+REPEATS = 3
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _timed(func, *args):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def bench_bpm(seconds: float, sr: int) -> dict:
+    from src.tools.audio_features import extract_descriptors
+
+    errors, wall = [], 0.0
+    for bpm in BPMS:
+        y = click_track(bpm, seconds, sr)
+        descriptors, elapsed = _timed(extract_descriptors, y, sr)
+        errors.append(abs(descriptors.tempo - bpm))
+        wall += elapsed
+    return {
+        "wall_seconds": wall / len(BPMS),
+        "accuracy": {
+            "mean_abs_bpm_error": float(np.mean(errors)),
+            "within_2_bpm": float(np.mean(np.array(errors) <= 2.0)),
+        },
+    }
+
+
+def bench_bpm_fast(seconds: float, sr: int) -> dict:
+    from src.tools.audio_features import estimate_tempo_fast
+
+    errors, octave_flagged, wall = [], [], 0.0
+    for bpm in BPMS:
+        y = click_track(bpm, seconds, sr)
+        estimate, elapsed = _timed(estimate_tempo_fast, y, sr)
+        errors.append(abs(estimate.bpm - bpm))
+        octave_flagged.append(estimate.octave_ambiguity["ambiguous"])
+        wall += elapsed
+    return {
+        "wall_seconds": wall / len(BPMS),
+        "accuracy": {
+            "mean_abs_bpm_error": float(np.mean(errors)),
+            "within_2_bpm": float(np.mean(np.array(errors) <= 2.0)),
+            "octave_ambiguous": float(np.mean(octave_flagged)),
+        },
+    }
+
+
+def bench_quality(seconds: float, sr: int) -> dict:
+    from src.tools.audio_features import extract_descriptors
+
+    y = shaped_noise(seconds, sr)
+    descriptors, wall = _timed(extract_descriptors, y, sr)
+    reference_rms = float(np.sqrt(np.mean(y.astype(np.float64) ** 2)))
+    return {
+        "wall_seconds": wall,
+        "accuracy": {
+            "duration_error_seconds": abs(descriptors.duration - seconds),
+            "rms_relative_error": abs(descriptors.rms_energy - reference_rms)
+            / reference_rms,
+        },
+    }
+
+
+def bench_genre(seconds: float, sr: int) -> dict:
+    from src.tools.audio_features import extract_descriptors
+    from src.tools.genre_scoring import GenreScorer
+
+    clips = [genre_like(genre, seconds, sr) for genre in GENRES]
+    scorer = GenreScorer()
+
+    def classify():
+        # Descriptor extraction dominates; scoring is one broadcast
+        descriptors = [extract_descriptors(y, sr) for y in clips]
+        return scorer.score(GenreScorer.feature_matrix(descriptors), list(GENRES))
+
+    confidence, wall = _timed(classify)
+    per_genre = {}
+    for row, genre in enumerate(GENRES):
+        others = np.delete(confidence[row], row)
+        nearest = np.delete(np.arange(len(GENRES)), row)[others.argmax()]
+        per_genre[genre] = {
+            # Weighted, tolerance-scaled distance; confidence is 2**-distance
+            "distance": float(-np.log2(confidence[row, row])),
+            "confidence": float(confidence[row, row]),
+            "nearest_other": GENRES[nearest],
+            "margin": float(confidence[row, row] - others.max()),
+        }
+    return {
+        "wall_seconds": wall / len(GENRES),
+        "calibration": {
+            "min_margin": min(entry["margin"] for entry in per_genre.values()),
+            "per_genre": per_genre,
+        },
+    }
+
+
+BENCHMARKS = {
+    "bpm": bench_bpm,
+    "bpm_fast": bench_bpm_fast,
+    "quality": bench_quality,
+    "genre": bench_genre,
+}
+
+
+def _run_case(name: str, seconds: float, sr: int) -> dict:
+    result = BENCHMARKS[name](seconds, sr)
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+
+def run_suite(names=None) -> dict:
+    """Runs every case in a fresh process so peak RSS is per case."""
+    context = multiprocessing.get_context("spawn")
+    cases = []
+    for name in names or BENCHMARKS:
+        for seconds in LENGTHS:
+            for sr in SAMPLE_RATES:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    result = pool.submit(_run_case, name, seconds, sr).result()
+                cases.append(
+                    {
+                        "benchmark": name,
+                        "track_seconds": seconds,
+                        "sample_rate": sr,
+                        **result,
+                    }
+                )
+                print(
+                    f"{name:8s} {seconds:6.0f}s {sr:6d}Hz "
+                    f"{result['wall_seconds'] * 1000:9.1f} ms "
+                    f"{result['peak_rss_mb']:8.1f} MB"
+                )
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": _environment(),
+        "cases": cases,
+    }
+
+
+def _environment() -> dict:
+    import librosa
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "librosa": librosa.__version__,
+    }
+
+
+def compare(baseline: dict, current: dict) -> None:
+    """Prints wall time and peak RSS changes against a previous run."""
+
+    def key(case):
+        return case["benchmark"], case["track_seconds"], case["sample_rate"]
+
+    previous = {key(case): case for case in baseline["cases"]}
+    for case in current["cases"]:
+        old = previous.get(key(case))
+        if not old:
+            continue
+        wall = case["wall_seconds"] / old["wall_seconds"] - 1
+        rss = case["peak_rss_mb"] / old["peak_rss_mb"] - 1
+        print(
+            f"{case['benchmark']:8s} {case['track_seconds']:6.0f}s "
+            f"{case['sample_rate']:6d}Hz wall {wall:+7.1%} rss {rss:+7.1%}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    parser.add_argument("--only", nargs="*", choices=list(BENCHMARKS))
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = run_suite(args.only)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    if baseline:
+        compare(baseline, results)
+
+
+if __name__ == "__main__":
+    main()
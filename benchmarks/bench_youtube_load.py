@@ -0,0 +1,220 @@
+"""
+Load harness for the YouTube tools against the local API stand-in.
+
+Generates playlists end to end (search, metadata, regional availability,
+create, add) from concurrent workers against ``benchmarks.fake_youtube``
+and reports requests per second, p50/p99 latency per step and quota units
+per playlist as JSON.
+
+    python -m benchmarks.bench_youtube_load --playlists 20 --concurrency 4
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.fake_youtube import FakeConfig, FakeYouTubeServer
+
+GENRES = ("rock", "pop", "jazz", "latin", "electronic", "hip hop", "country")
+QUERY_VARIANTS = ("hits", "classics", "live")
+STEPS = ("search", "metadata", "availability", "create", "add")
+
+
+def _configure_environment(base_url: str, units_per_second: float) -> None:
+    # Caches and quota usage live in a scratch dir so runs do not interfere;
+    # the paths are read when the tool modules are first imported
+    scratch = tempfile.mkdtemp(prefix="plai-load-")
+    os.environ["PLAI_YOUTUBE_API_BASE_URL"] = base_url
+    os.environ.setdefault("YOUTUBE_API_KEY", "fake-api-key")
+    os.environ["PLAI_METADATA_CACHE_PATH"] = os.path.join(scratch, "metadata.sqlite3")
+    os.environ["PLAI_SEARCH_CACHE_PATH"] = os.path.join(scratch, "search.sqlite3")
+    os.environ["PLAI_QUOTA_USAGE_PATH"] = os.path.join(scratch, "quota.sqlite3")
+    os.environ["PLAI_REGION_INDEX_PATH"] = os.path.join(scratch, "regions.npz")
+    os.environ["PLAI_YOUTUBE_DAILY_QUOTA"] = str(10**9)
+    os.environ["PLAI_YOUTUBE_UNITS_PER_SECOND"] = str(units_per_second)
+
+
+def _percentiles(values) -> dict:
+    if not values:
+        return {"p50_ms": None, "p99_ms": None, "count": 0}
+    ms = np.asarray(values) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+        "count": len(values),
+    }
+
+
+def run_load(playlists: int, concurrency: int, tracks: int, pages: int) -> dict:
+    from google.auth.credentials import AnonymousCredentials
+
+    from src.tools.http_transport import get_http_pool
+    from src.tools.playlist_tools import RegionalAvailabilityTool
+    from src.tools.quota import get_quota_scheduler
+    from src.tools.search_cache import get_search_cache
+    from src.tools.youtube_service import get_service_cache
+    from src.tools.youtube_tools import (
+        PlaylistAddTool,
+        PlaylistCreateTool,
+        VideoMetadataTool,
+        VideoSearchTool,
+    )
+
+    get_service_cache().use_credentials(AnonymousCredentials())
+    search, metadata = VideoSearchTool(), VideoMetadataTool()
+    availability, create, add = (
+        RegionalAvailabilityTool(),
+        PlaylistCreateTool(),
+        PlaylistAddTool(),
+    )
+
+    def generate(index: int) -> dict:
+        genre = GENRES[index % len(GENRES)]
+        timings, start = {}, time.perf_counter()
+
+        def step(name, func, **kwargs):
+            step_start = time.perf_counter()
+            result = func(**kwargs)
+            timings[name] = time.perf_counter() - step_start
+            if isinstance(result, dict) and result.get("status") == "error":
+                raise RuntimeError(f"{name}: {result['message']}")
+            return result
+
+        try:
+            found = step(
+                "search",
+                search._run,
+                queries=[f"{genre} {variant}" for variant in QUERY_VARIANTS],
+                filters={"language": "en"},
+                max_pages_per_query=pages,
+            )
+            video_ids = found["video_ids"]
+            step("metadata", metadata._run, video_ids=video_ids)
+            regions = step(
+                "availability",
+                availability._run,
+                video_ids=video_ids,
+                region_code="US",
+            )
+            created = step(
+                "create",
+                create._run,
+                title=f"Load test {index}",
+                description=genre,
+                privacy_status="private",
+            )
+            added = step(
+                "add",
+                add._run,
+                playlist_id=created["playlist_id"],
+                video_ids=regions["available"][:tracks],
+            )
+            error = None if not added["failed_videos"] else "add: failed videos"
+        except Exception as e:
+            error = str(e)
+        return {
+            "seconds": time.perf_counter() - start,
+            "steps": timings,
+            "error": error,
+        }
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        runs = list(executor.map(generate, range(playlists)))
+    wall = time.perf_counter() - start
+
+    return {
+        "wall_seconds": wall,
+        "runs": runs,
+        "search_cache": get_search_cache().stats(),
+        "client_quota": get_quota_scheduler().metrics(),
+        "http_pool": get_http_pool().stats(),
+    }
+
+
+def summarize(load: dict, server_state: dict) -> dict:
+    runs = load["runs"]
+    completed = [run for run in runs if run["error"] is None]
+    requests = sum(server_state["requests"].values())
+    return {
+        "playlists": len(runs),
+        "completed": len(completed),
+        "errors": [run["error"] for run in runs if run["error"]],
+        "wall_seconds": round(load["wall_seconds"], 3),
+        "requests": requests,
+        "requests_per_second": round(requests / load["wall_seconds"], 1),
+        "playlist_latency": _percentiles([run["seconds"] for run in completed]),
+        "step_latency": {
+            name: _percentiles(
+                [run["steps"][name] for run in runs if name in run["steps"]]
+            )
+            for name in STEPS
+        },
+        "quota_units": server_state["quota_used"],
+        "quota_units_per_playlist": (
+            round(server_state["quota_used"] / len(completed), 1) if completed else None
+        ),
+        "server": server_state,
+        "search_cache": load["search_cache"],
+        "http_pool": load["http_pool"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--playlists", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--tracks", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=2, help="Search pages per query")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--lost-response-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--units-per-second",
+        type=float,
+        default=1e6,
+        help="Client quota rate limit; the default effectively disables it",
+    )
+    parser.add_argument("--output", default="bench_youtube_load.json")
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        lost_response_rate=args.lost_response_rate,
+    )
+    server = FakeYouTubeServer(config=config).start()
+    _configure_environment(server.base_url, args.units_per_second)
+    try:
+        load = run_load(args.playlists, args.concurrency, args.tracks, args.pages)
+        summary = summarize(load, server.state.snapshot())
+    finally:
+        server.shutdown()
+
+    summary = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": vars(args),
+        **summary,
+    }
+    with open(args.output, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    print(
+        f"{summary['completed']}/{summary['playlists']} playlists in "
+        f"{summary['wall_seconds']:.1f}s, {summary['requests_per_second']} req/s, "
+        f"{summary['quota_units_per_playlist']} units/playlist"
+    )
+    for name, stats in summary["step_latency"].items():
+        print(f"{name:13s} p50 {stats['p50_ms']} ms  p99 {stats['p99_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+Local stand-in for the parts of the YouTube Data API v3 the tools use.
+
+Serves search.list, videos.list, channels.list, playlists list/insert and
+playlistItems list/insert/update with synthetic, deterministic data.
+Latency, error injection and quota accounting are configurable. Point the
+tools at it with ``PLAI_YOUTUBE_API_BASE_URL``:
+
+    python -m benchmarks.fake_youtube --port 8765 --latency-ms 80
+    PLAI_YOUTUBE_API_BASE_URL=http://127.0.0.1:8765 crewai run
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+API_PREFIX = "/youtube/v3/"
+PAGE_LIMIT = 5
+REGIONS = ("US", "GB", "ES", "MX", "DE", "FR", "JP", "BR")
+
+# Same unit costs as the live API
+COSTS = {
+    ("search", "GET"): 100,
+    ("videos", "GET"): 1,
+    ("channels", "GET"): 1,
+    ("playlists", "GET"): 1,
+    ("playlistItems", "GET"): 1,
+    ("playlists", "POST"): 50,
+    ("playlistItems", "POST"): 50,
+    ("playlistItems", "PUT"): 50,
+}
+
+
+@dataclass
+class FakeConfig:
+    """Behaviour of the fake API server."""
+
+    latency_ms: float = 50.0
+    jitter_ms: float = 20.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    # Share of writes that are applied but still answered with error_status
+    lost_response_rate: float = 0.0
+    daily_quota: Optional[int] = None
+    seed: int = 0
+
+
+class FakeYouTubeState:
+    """Playlists, quota usage and request counters of a fake server."""
+
+    def __init__(self, config: FakeConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.playlists: Dict[str, List[Tuple[str, str]]] = {}
+        self.playlist_snippets: Dict[str, dict] = {}
+        self.quota_used = 0
+        self.requests: Counter = Counter()
+        self.errors: Counter = Counter()
+        self._next_id = 0
+
+    def new_id(self, prefix: str) -> str:
+        with self.lock:
+            self._next_id += 1
+            return f"{prefix}{self._next_id:08d}"
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "quota_used": self.quota_used,
+                "requests": dict(self.requests),
+                "errors": dict(self.errors),
+                "playlists": len(self.playlists),
+                "duplicate_items": sum(
+                    len(items) - len({video_id for _, video_id in items})
+                    for items in self.playlists.values()
+                ),
+            }
+
+    def reset(self) -> None:
+        with self.lock:
+            self.playlists.clear()
+            self.playlist_snippets.clear()
+            self.quota_used = 0
+            self.requests.clear()
+            self.errors.clear()
+
+
+def video_ids_for(query: str, page: int, count: int) -> List[str]:
+    """Deterministic video IDs for a search page."""
+    return [
+        hashlib.sha1(f"{query}:{page}:{i}".encode()).hexdigest()[:11]
+        for i in range(count)
+    ]
+
+
+def video_resource(video_id: str, parts: List[str]) -> dict:
+    """Synthetic but stable resource for any video ID."""
+    seed = int(hashlib.sha1(video_id.encode()).hexdigest()[:8], 16)
+    resource = {"kind": "youtube#video", "id": video_id}
+    if "snippet" in parts:
+        resource["snippet"] = {
+            "title": f"Track {video_id}",
+            "description": f"Synthetic video {video_id}",
+            "tags": ["music"],
+            "publishedAt": f"{2000 + seed % 24}-01-01T00:00:00Z",
+            "defaultLanguage": ("en", "es", "fr")[seed % 3],
+        }
+    if "contentDetails" in parts:
+        details = {"duration": f"PT{2 + seed % 4}M{seed % 60}S"}
+        if seed % 7 == 0:
+            details["regionRestriction"] = {"blocked": [REGIONS[seed % len(REGIONS)]]}
+        elif seed % 11 == 0:
+            details["regionRestriction"] = {"allowed": list(REGIONS[:3])}
+        resource["contentDetails"] = details
+    if "statistics" in parts:
+        resource["statistics"] = {
+            "viewCount": str(seed % 10_000_000),
+            "likeCount": str(seed % 100_000),
+            "commentCount": str(seed % 5_000),
+        }
+    if "status" in parts:
+        resource["status"] = {
+            "uploadStatus": "processed",
+            "privacyStatus": "public",
+            "embeddable": True,
+        }
+    return resource
+
+
+class FakeYouTubeHandler(BaseHTTPRequestHandler):
+    """Routes API requests to handlers on the server's ``FakeYouTubeState``."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self, method: str) -> None:
+        state: FakeYouTubeState = self.server.state
+        url = urlparse(self.path)
+        resource = url.path[len(API_PREFIX) :]
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+        config = state.config
+        latency_ms = config.latency_ms + state.random.gauss(0, config.jitter_ms)
+        time.sleep(max(latency_ms, 0) / 1000)
+
+        handler = getattr(self, f"_{method.lower()}_{resource}", None)
+        cost = COSTS.get((resource, method))
+        if handler is None or cost is None:
+            return self._error(404, "notFound", f"Unknown endpoint {method} {url.path}")
+
+        with state.lock:
+            state.requests[f"{resource}.{method}"] += 1
+            quota = config.daily_quota
+            if quota is not None and state.quota_used >= quota:
+                state.errors["quotaExceeded"] += 1
+                exceeded = True
+            else:
+                # Like the live API, failed requests are charged too
+                state.quota_used += cost
+                exceeded = False
+            inject = state.random.random() < config.error_rate
+            if inject:
+                state.errors[str(config.error_status)] += 1
+        if exceeded:
+            return self._error(403, "quotaExceeded", "The request cannot be completed")
+        if inject:
+            return self._error(config.error_status, "backendError", "Injected error")
+
+        try:
+            status, payload = handler(params, body)
+        except ValueError as e:
+            return self._error(400, str(e), str(e))
+        if method != "GET":
+            with state.lock:
+                lost = state.random.random() < config.lost_response_rate
+                if lost:
+                    state.errors[f"{config.error_status} after write"] += 1
+            if lost:
+                return self._error(config.error_status, "backendError", "Lost response")
+        self._send(status, payload)
+
+    def _get_search(self, params, body):
+        page = int(params.get("pageToken") or 0)
+        count = int(params.get("maxResults", 5))
+        items = [
+            {
+                "kind": "youtube#searchResult",
+                "id": {"kind": "youtube#video", "videoId": video_id},
+                "snippet": {
+                    "title": f"Track {video_id}",
+                    "description": f"Result for {params.get('q', '')}",
+                    "thumbnails": {
+                        "default": {"url": f"https://i.ytimg.com/vi/{video_id}"}
+                    },
+                },
+            }
+            for video_id in video_ids_for(params.get("q", ""), page, count)
+        ]
+        response = {"items": items, "pageInfo": {"resultsPerPage": count}}
+        if page + 1 < PAGE_LIMIT:
+            response["nextPageToken"] = str(page + 1)
+        return 200, response
+
+    def _get_videos(self, params, body):
+        parts = params.get("part", "").split(",")
+        ids = [video_id for video_id in params.get("id", "").split(",") if video_id]
+        if len(ids) > 50:
+            raise ValueError("tooManyIds")
+        # Like the real API, maxResults cannot be combined with id
+        if ids and "maxResults" in params:
+            raise ValueError("incompatibleParameters")
+        return 200, {"items": [video_resource(video_id, parts) for video_id in ids]}
+
+    def _get_channels(self, params, body):
+        return 200, {"items": [{"id": "UCfakechannel", "snippet": {"title": "Fake"}}]}
+
+    def _get_playlists(self, params, body):
+        state = self.server.state
+        with state.lock:
+            snippets = list(state.playlist_snippets.items())
+        count = int(params.get("maxResults", 5))
+        start = int(params.get("pageToken") or 0)
+        items = [
+            {"kind": "youtube#playlist", "id": playlist_id, "snippet": snippet}
+            for playlist_id, snippet in reversed(snippets)
+        ]
+        response = {"items": items[start : start + count]}
+        if start + count < len(items):
+            response["nextPageToken"] = str(start + count)
+        return 200, response
+
+    def _post_playlists(self, params, body):
+        state = self.server.state
+        playlist_id = state.new_id("PL")
+        with state.lock:
+            state.playlists[playlist_id] = []
+            state.playlist_snippets[playlist_id] = {
+                **body.get("snippet", {}),
+                "publishedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            }
+            snippet = state.playlist_snippets[playlist_id]
+        response = {"kind": "youtube#playlist", "id": playlist_id, **body}
+        return 200, {**response, "snippet": snippet}
+
+    def _get_playlistItems(self, params, body):
+        state = self.server.state
+        with state.lock:
+            items = list(state.playlists.get(params.get("playlistId"), []))
+        start = int(params.get("pageToken") or 0)
+        count = int(params.get("maxResults", 5))
+        response = {
+            "items": [
+                {"id": item_id, "snippet": {"resourceId": {"videoId": video_id}}}
+                for item_id, video_id in items[start : start + count]
+            ],
+            "pageInfo": {"totalResults": len(items), "resultsPerPage": count},
+        }
+        if start + count < len(items):
+            response["nextPageToken"] = str(start + count)
+        return 200, response
+
+    def _post_playlistItems(self, params, body):
+        state = self.server.state
+        snippet = body.get("snippet", {})
+        item_id = state.new_id("PLI")
+        with state.lock:
+            items = state.playlists.get(snippet.get("playlistId"))
+            if items is None:
+                raise ValueError("playlistNotFound")
+            position = snippet.get("position", len(items))
+            if not 0 <= position <= len(items):
+                raise ValueError("invalidPlaylistItemPosition")
+            items.insert(position, (item_id, snippet["resourceId"]["videoId"]))
+        return 200, {"kind": "youtube#playlistItem", "id": item_id, **body}
+
+    def _put_playlistItems(self, params, body):
+        state = self.server.state
+        snippet = body.get("snippet", {})
+        with state.lock:
+            items = state.playlists.get(snippet.get("playlistId"), [])
+            index = next(
+                (i for i, (item_id, _) in enumerate(items) if item_id == body["id"]),
+                None,
+            )
+            if index is None:
+                raise ValueError("playlistItemNotFound")
+            position = snippet.get("position", index)
+            if not 0 <= position < len(items):
+                raise ValueError("invalidPlaylistItemPosition")
+            items.insert(position, items.pop(index))
+        return 200, {"kind": "youtube#playlistItem", **body}
+
+    def _error(self, status: int, reason: str, message: str) -> None:
+        self._send(
+            status,
+            {
+                "error": {
+                    "code": status,
+                    "message": message,
+                    "errors": [{"reason": reason, "message": message}],
+                }
+            },
+        )
+
+    def _send(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeYouTubeServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding a ``FakeYouTubeState``."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config=None):
+        super().__init__((host, port), FakeYouTubeHandler)
+        self.state = FakeYouTubeState(config or FakeConfig())
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeYouTubeServer":
+        """Serves requests on a background thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--lost-response-rate", type=float, default=0.0)
+    parser.add_argument("--daily-quota", type=int)
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        lost_response_rate=args.lost_response_rate,
+        daily_quota=args.daily_quota,
+    )
+    server = FakeYouTubeServer(args.host, args.port, config)
+    print(f"Fake YouTube API listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
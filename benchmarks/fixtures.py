@@ -0,0 +1,86 @@
+"""Synthetic audio fixtures with known ground truth for the benchmarks."""
+
+import numpy as np
+
+
+def click_track(
+    bpm: float, seconds: float, sr: int = 22050, seed: int = 0, noise: float = 0.01
+) -> np.ndarray:
+    """Decaying clicks at a known tempo over a little background noise."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sr)
+    y = noise * rng.standard_normal(n)
+
+    click_len = int(0.03 * sr)
+    click = np.sin(2 * np.pi * 1000 * np.arange(click_len) / sr)
+    click *= np.exp(-np.arange(click_len) / (0.005 * sr))
+
+    period = 60.0 / bpm * sr
+    for start in np.arange(0, n - click_len, period).astype(int):
+        y[start : start + click_len] += click
+    return y.astype(np.float32)
+
+
+def shaped_noise(
+    seconds: float, sr: int = 22050, slope_db_per_octave: float = -3.0, seed: int = 0
+) -> np.ndarray:
+    """Noise whose spectrum falls by ``slope_db_per_octave`` (0 is white)."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sr)
+    spectrum = np.fft.rfft(rng.standard_normal(n))
+    freqs = np.fft.rfftfreq(n, 1 / sr)
+    freqs[0] = freqs[1]
+    gain = (freqs / freqs[1]) ** (slope_db_per_octave / (20 * np.log10(2)))
+    y = np.fft.irfft(spectrum * gain, n)
+    return (0.2 * y / np.abs(y).max()).astype(np.float32)
+
+
+def harmonic_tone(
+    f0: float, max_hz: float, seconds: float, sr: int = 22050
+) -> np.ndarray:
+    """Sawtooth-like tone: harmonics of ``f0`` up to ``max_hz`` at 1/k amplitude."""
+    t = np.arange(int(seconds * sr)) / sr
+    y = np.zeros_like(t)
+    for k in range(1, int(min(max_hz, sr / 2) / f0) + 1):
+        y += np.sin(2 * np.pi * f0 * k * t) / k
+    return (y / np.sqrt(np.mean(y**2))).astype(np.float32)
+
+
+def bandlimited_noise(
+    cutoff_hz: float, seconds: float, sr: int = 22050, seed: int = 0
+) -> np.ndarray:
+    """Unit-RMS white noise with everything above ``cutoff_hz`` removed."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sr)
+    spectrum = np.fft.rfft(rng.standard_normal(n))
+    spectrum[np.fft.rfftfreq(n, 1 / sr) > cutoff_hz] = 0
+    y = np.fft.irfft(spectrum, n)
+    return (y / np.sqrt(np.mean(y**2))).astype(np.float32)
+
+
+# Tempo, tone bandwidth (Hz), noise cutoff (Hz), noise share and RMS fitted so
+# the extracted descriptors land near each genre prototype at both 22.05 and
+# 44.1 kHz. Being fitted to the prototypes, they check scorer calibration and
+# timing; they say nothing about accuracy on real music.
+GENRE_FIXTURES = {
+    "rock": (120.0, 10000.0, 6100.0, 0.26, 0.15),
+    "pop": (118.0, 9600.0, 5200.0, 0.26, 0.14),
+    "hip hop": (92.0, 7000.0, 4550.0, 0.25, 0.16),
+    "electronic": (126.0, 5800.0, 7900.0, 0.22, 0.17),
+    "country": (110.0, 7800.0, 4700.0, 0.24, 0.12),
+    "latin": (100.0, 7900.0, 5200.0, 0.26, 0.14),
+    "jazz": (110.0, 3900.0, 4850.0, 0.2, 0.09),
+    "classical": (85.0, 5900.0, 3100.0, 0.22, 0.06),
+}
+
+
+def genre_like(
+    genre: str, seconds: float, sr: int = 22050, seed: int = 0
+) -> np.ndarray:
+    """Tone, noise and clicks mixed to sit near a genre prototype's descriptors."""
+    tempo, tone_hz, noise_hz, noise_mix, rms = GENRE_FIXTURES[genre]
+    y = (1 - noise_mix) * harmonic_tone(110.0, tone_hz, seconds, sr)
+    y += noise_mix * bandlimited_noise(noise_hz, seconds, sr, seed)
+    # Noise-free clicks, so the only broadband noise is the band-limited part
+    y += 3.0 * click_track(tempo, seconds, sr, seed, noise=0.0)
+    return (rms * y / np.sqrt(np.mean(y**2))).astype(np.float32)
@@ -4,7 +4,9 @@ from langchain_openai import ChatOpenAI
 
 from src.tools.music_analysis_tools import (
     AudioQualityTool,
+    BatchAudioAnalysisTool,
     BPMDetectionTool,
+    GenreConfidenceMatrixTool,
     GenreConfidenceTool,
 )
 from src.tools.parameter_tools import (
@@ -68,8 +70,10 @@ class PlaiCrew:
             llm=self.llm(),
             tools=[
                 AudioQualityTool(),
+                BatchAudioAnalysisTool(),
                 BPMDetectionTool(),
                 GenreConfidenceTool(),
+                GenreConfidenceMatrixTool(),
             ],
             max_iter=3,
             verbose=True,
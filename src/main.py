@@ -1,7 +1,9 @@
 #!/usr/bin/env python
+import os
 import sys
 
 from src.crew import PlaiCrew
+from src.tools.run_journal import RUN_ID_ENV, get_journal
 
 
 def run():
@@ -21,7 +23,12 @@ def run():
             "languages": ["English", "Spanish"],
         },
     }
-    PlaiCrew().crew().kickoff(inputs=inputs)
+    # Journal playlist writes so a replay of this run does not repeat them
+    journal = get_journal()
+    run_id = os.environ[RUN_ID_ENV] = journal.start_run()
+    crew = PlaiCrew().crew()
+    journal.record_tasks(run_id, [task.id for task in crew.tasks])
+    crew.kickoff(inputs=inputs)
 
 
 def train():
@@ -55,7 +62,16 @@ def replay():
     Replay the crew execution from a specific task.
     """
     try:
-        PlaiCrew().crew().replay(task_id=sys.argv[1])
+        # Resume the journal of the run the task belongs to, so its finished
+        # playlist writes are skipped; unknown tasks get a fresh run
+        task_id = sys.argv[1]
+        journal = get_journal()
+        run_id = journal.run_for_task(task_id) or journal.start_run()
+        os.environ[RUN_ID_ENV] = run_id
+        crew = PlaiCrew().crew()
+        # The replay stores its outputs under this process's task IDs
+        journal.record_tasks(run_id, [task.id for task in crew.tasks])
+        crew.replay(task_id=task_id)
 
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
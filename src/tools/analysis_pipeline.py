@@ -0,0 +1,248 @@
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+from src.tools.audio_cache import (
+    AnalysisWindow,
+    AudioFetchError,
+    CachedAudio,
+    NoAudioStreamError,
+    StagedStream,
+    TruncatedStreamError,
+    get_audio_cache,
+)
+from src.tools.audio_features import get_descriptors
+
+# Sentinel closing a stage queue
+_DONE = object()
+# How often the consumer checks that the analysis stage is still running
+RESULT_POLL_SECONDS = 0.5
+# Workers must not fork from a process already running the stage threads
+POOL_START_METHOD = "forkserver"
+
+
+def describe_audio(video_id: str, audio: CachedAudio) -> dict:
+    """Builds the analysis result of a cached track."""
+    descriptors = get_descriptors(audio)
+    return {
+        "video_id": video_id,
+        "pcm_handle": audio.handle,
+        "bitrate": audio.abr,
+        **descriptors.to_dict(),
+    }
+
+
+def _analyze_item(video_id: str, item: Union[CachedAudio, StagedStream]):
+    """Decode and DSP stage; runs in a worker process."""
+    try:
+        if isinstance(item, StagedStream):
+            try:
+                item = get_audio_cache().commit(item)
+            except NoAudioStreamError:
+                return "Error: No audio stream available for this video"
+            except AudioFetchError as youtube_error:
+                return f"YouTube Error: {str(youtube_error)}"
+        return describe_audio(video_id, item)
+    except TruncatedStreamError:
+        # The download stage fetches the whole stream instead
+        raise
+    except Exception as e:
+        return f"Error analyzing audio: {str(e)}"
+
+
+class AnalysisPipeline:
+    """
+    Download → decode → analyze pipeline over many video IDs.
+
+    Downloads run on a pool of threads and feed a bounded queue; decoding and
+    DSP run in a process pool. While track N is being analyzed, track N+1 is
+    already downloading, and the queue bound caps how many downloaded but
+    unanalyzed streams exist at once. Each download gets its own scratch
+    directory, so items never share files. A ranged excerpt that turns out
+    too short to decode goes back to the download stage for the full stream.
+    """
+
+    def __init__(
+        self,
+        download_workers: int = 4,
+        analysis_workers: Optional[int] = None,
+        queue_size: int = 8,
+        window: Optional[AnalysisWindow] = None,
+    ):
+        self.download_workers = download_workers
+        self.analysis_workers = analysis_workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.window = window
+
+    def run(self, video_ids: Iterable[str]) -> Iterator[Tuple[str, Union[dict, str]]]:
+        """
+        Yields ``(video_id, result)`` pairs in completion order.
+
+        Errors are reported per track as strings, like the analysis tools.
+        Duplicate IDs are analyzed once.
+        """
+        unique_ids = list(dict.fromkeys(video_ids))
+        if not unique_ids:
+            return
+
+        pending: queue.Queue = queue.Queue()
+        for video_id in unique_ids:
+            pending.put((video_id, True))
+        staged: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        results: queue.Queue = queue.Queue()
+        stop = threading.Event()
+
+        download_threads = [
+            threading.Thread(
+                target=self._download_stage,
+                args=(pending, staged, results, stop),
+                daemon=True,
+            )
+            for _ in range(min(self.download_workers, len(unique_ids)))
+        ]
+        analysis_workers = min(self.analysis_workers, len(unique_ids))
+
+        with ProcessPoolExecutor(
+            max_workers=analysis_workers,
+            mp_context=multiprocessing.get_context(POOL_START_METHOD),
+        ) as executor:
+            dispatcher = threading.Thread(
+                target=self._analysis_stage,
+                args=(executor, analysis_workers, pending, staged, results, stop),
+                daemon=True,
+            )
+            for thread in download_threads:
+                thread.start()
+            dispatcher.start()
+
+            remaining = set(unique_ids)
+            try:
+                while remaining:
+                    try:
+                        video_id, result = results.get(timeout=RESULT_POLL_SECONDS)
+                    except queue.Empty:
+                        if dispatcher.is_alive():
+                            continue
+                        # Nothing is left to report the outstanding tracks
+                        for video_id in list(remaining):
+                            remaining.discard(video_id)
+                            yield video_id, "Error analyzing audio: analysis stopped"
+                        break
+                    if video_id in remaining:
+                        remaining.discard(video_id)
+                        yield video_id, result
+            finally:
+                stop.set()
+                for thread in download_threads:
+                    thread.join()
+                # Wake the dispatcher, unless it is already gone
+                while dispatcher.is_alive():
+                    try:
+                        staged.put(_DONE, timeout=RESULT_POLL_SECONDS)
+                        break
+                    except queue.Full:
+                        continue
+                dispatcher.join()
+
+    def _download_stage(self, pending, staged, results, stop) -> None:
+        cache = get_audio_cache()
+        while not stop.is_set():
+            # Keep waiting after the queue drains: analysis may send back
+            # excerpts that need the full stream
+            try:
+                video_id, ranged = pending.get(timeout=RESULT_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+            if not video_id or len(video_id) != 11:
+                results.put((video_id, "Error: Invalid YouTube video ID"))
+                continue
+
+            try:
+                item = cache.lookup(video_id, self.window) or cache.download(
+                    video_id, self.window, ranged
+                )
+            except NoAudioStreamError:
+                results.put(
+                    (video_id, "Error: No audio stream available for this video")
+                )
+                continue
+            except AudioFetchError as youtube_error:
+                results.put((video_id, f"YouTube Error: {str(youtube_error)}"))
+                continue
+            except Exception as e:
+                results.put((video_id, f"Error analyzing audio: {str(e)}"))
+                continue
+
+            # Blocks while the analysis stage is saturated
+            while not stop.is_set():
+                try:
+                    staged.put((video_id, item), timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+            else:
+                if isinstance(item, StagedStream):
+                    cache.discard(item)
+
+    def _analysis_stage(
+        self, executor, workers, pending, staged, results, stop
+    ) -> None:
+        # At most one queued task per worker beyond those running
+        slots = threading.BoundedSemaphore(workers * 2)
+        # Set once the pool can take no more work
+        failure: Optional[str] = None
+
+        def on_done(future, video_id):
+            try:
+                result = future.result()
+            except TruncatedStreamError:
+                slots.release()
+                pending.put((video_id, False))
+                return
+            except Exception as e:
+                # A crashed worker only fails the tracks it was running
+                result = f"Error analyzing audio: {str(e)}"
+            slots.release()
+            results.put((video_id, result))
+
+        while True:
+            entry = staged.get()
+            if entry is _DONE:
+                return
+            video_id, item = entry
+            if stop.is_set() or failure:
+                if isinstance(item, StagedStream):
+                    get_audio_cache().discard(item)
+                if failure:
+                    results.put((video_id, failure))
+                continue
+
+            slots.acquire()
+            try:
+                future = executor.submit(_analyze_item, video_id, item)
+            except Exception as e:
+                # The pool is broken or shut down: fail this track and the
+                # ones not yet downloaded instead of leaving them unreported
+                slots.release()
+                failure = f"Error analyzing audio: {str(e)}"
+                if isinstance(item, StagedStream):
+                    get_audio_cache().discard(item)
+                results.put((video_id, failure))
+                self._fail_pending(pending, results, failure)
+                continue
+            future.add_done_callback(
+                lambda done, video_id=video_id: on_done(done, video_id)
+            )
+
+    @staticmethod
+    def _fail_pending(pending, results, failure: str) -> None:
+        while True:
+            try:
+                video_id, _ = pending.get_nowait()
+            except queue.Empty:
+                return
+            results.put((video_id, failure))
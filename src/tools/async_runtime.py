@@ -0,0 +1,84 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional
+
+# Threads available for blocking network I/O across all async tools
+IO_WORKERS = int(os.getenv("PLAI_IO_WORKERS", "16"))
+
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_io_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Returns the executor shared by every tool for blocking I/O."""
+    global _io_executor
+    with _lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(
+                max_workers=IO_WORKERS, thread_name_prefix="plai-io"
+            )
+        return _io_executor
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Returns the shared event loop, running on a background thread."""
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="plai-event-loop", daemon=True
+            ).start()
+        return _loop
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """Runs a blocking call on the shared I/O executor and awaits its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_io_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+def run_sync(coroutine: Awaitable) -> Any:
+    """Runs a coroutine on the shared event loop from synchronous code."""
+    loop = get_event_loop()
+    if _running_loop() is loop:
+        # Waiting here would block the loop the coroutine needs
+        coroutine.close()
+        raise RuntimeError("run_sync() cannot be called from the shared event loop")
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class AsyncToolMixin:
+    """
+    Adds ``arun``/``_arun`` to a tool.
+
+    By default ``_arun`` runs ``_run`` on the shared I/O executor. Tools
+    that fan out override ``_arun`` to issue their requests concurrently and
+    make ``_run`` a ``run_sync`` call to it, since crews only ever call
+    ``_run``; such an ``_arun`` must not call ``_run`` back. The coroutine is
+    also handed to LangChain so async agents await it instead of blocking.
+    """
+
+    async def arun(self, *args, **kwargs) -> Any:
+        return await self._arun(*args, **kwargs)
+
+    async def _arun(self, *args, **kwargs) -> Any:
+        return await run_blocking(self._run, *args, **kwargs)
+
+    def to_langchain(self):
+        tool = super().to_langchain()
+        tool.coroutine = self._arun
+        return tool
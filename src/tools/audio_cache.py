@@ -0,0 +1,480 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+import librosa
+import numpy as np
+from pytube import YouTube
+
+DEFAULT_CACHE_DIR = os.getenv(
+    "PLAI_AUDIO_CACHE_DIR", os.path.join(".plai_cache", "audio")
+)
+DEFAULT_MAX_BYTES = int(os.getenv("PLAI_AUDIO_CACHE_MAX_BYTES", 2 * 1024**3))
+# Seconds a stream download may wait on the server before it is abandoned
+DOWNLOAD_TIMEOUT_SECONDS = float(os.getenv("PLAI_AUDIO_DOWNLOAD_TIMEOUT", 30))
+
+# PCM handles are the SHA-1 hex digests that name cache entries
+_HANDLE_PATTERN = re.compile(r"[0-9a-f]{40}")
+
+
+def is_valid_handle(handle: str) -> bool:
+    """Whether ``handle`` has the form of a PCM handle."""
+    return isinstance(handle, str) and bool(_HANDLE_PATTERN.fullmatch(handle))
+
+
+class AudioFetchError(Exception):
+    """Raised when the audio stream of a video cannot be downloaded."""
+
+
+class NoAudioStreamError(AudioFetchError):
+    """Raised when a video has no audio-only stream."""
+
+
+class TruncatedStreamError(Exception):
+    """Raised when a ranged stream prefix ends before the analysis window."""
+
+
+@dataclass(frozen=True)
+class AnalysisWindow:
+    """
+    Excerpt of a track to download and decode for fast analysis.
+
+    Only the bytes needed to reach ``offset + duration`` are fetched (with an
+    HTTP range request when the stream allows it) and only that excerpt is
+    decoded, at ``sample_rate``. Descriptors then describe the excerpt rather
+    than the whole track: tempo of steady-tempo music is usually within
+    ±2 BPM of the full-track value, while energy and spectral means can drift
+    by 10-20% on tracks with long intros, breakdowns or outros.
+    """
+
+    offset: float = 30.0
+    duration: float = 30.0
+    sample_rate: int = 22050
+
+    @property
+    def key(self) -> str:
+        return f"{self.offset:g}-{self.duration:g}-{self.sample_rate}"
+
+
+# Bytes fetched beyond the bitrate estimate to cover container headers and VBR
+RANGE_HEADROOM_BYTES = 256 * 1024
+RANGE_HEADROOM_RATIO = 1.25
+
+
+@dataclass
+class CachedAudio:
+    """Location of a cached audio stream and its decoded PCM."""
+
+    video_id: str
+    itag: int
+    abr: Optional[str]
+    stream_path: str
+    pcm_path: str
+    sample_rate: int
+    window: Optional[AnalysisWindow] = None
+
+    @property
+    def handle(self) -> str:
+        """Opaque handle that names this entry in the PCM store."""
+        return os.path.basename(os.path.dirname(self.pcm_path))
+
+    def load(self) -> np.ndarray:
+        """
+        Maps the decoded mono float32 signal read-only into memory.
+
+        Pages are shared through the OS page cache, so re-analysis and
+        parallel workers read the same decoded audio without copying it.
+        """
+        return np.load(self.pcm_path, mmap_mode="r")
+
+
+@dataclass
+class StagedStream:
+    """Raw stream downloaded to a scratch directory, not yet decoded."""
+
+    video_id: str
+    itag: int
+    abr: Optional[str]
+    scratch_dir: str
+    stream_path: str
+    partial: bool
+    window: Optional[AnalysisWindow] = None
+
+
+class AudioCache:
+    """
+    Content-addressed on-disk cache of raw audio streams and decoded PCM.
+
+    Entries are keyed by ``(video_id, itag)`` so each stream is downloaded and
+    decoded at most once per cache lifetime. The total size on disk is bounded
+    and the least recently used entries are evicted first.
+    """
+
+    def __init__(
+        self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        os.makedirs(os.path.join(cache_dir, "entries"), exist_ok=True)
+        os.makedirs(os.path.join(cache_dir, "aliases"), exist_ok=True)
+
+    def get_audio(
+        self, video_id: str, window: Optional[AnalysisWindow] = None
+    ) -> CachedAudio:
+        """
+        Returns the cached audio for a video, downloading it if needed.
+
+        With a ``window`` only that excerpt is fetched and decoded; excerpts
+        are cached separately from the full track.
+        """
+        cached = self.lookup(video_id, window)
+        if cached:
+            return cached
+
+        window_key = window.key if window else "full"
+        with self._key_lock(f"{video_id}:{window_key}"):
+            cached = self.lookup(video_id, window)
+            if cached:
+                return cached
+            try:
+                return self.commit(self.download(video_id, window))
+            except TruncatedStreamError:
+                return self.commit(self.download(video_id, window, ranged=False))
+
+    def lookup(
+        self, video_id: str, window: Optional[AnalysisWindow] = None
+    ) -> Optional[CachedAudio]:
+        """Returns the cached audio for a video without touching the network."""
+        itag = self._read_alias(video_id)
+        if itag is None:
+            return None
+        return self._lookup(video_id, itag, window)
+
+    def download(
+        self,
+        video_id: str,
+        window: Optional[AnalysisWindow] = None,
+        ranged: bool = True,
+    ) -> StagedStream:
+        """
+        Downloads the raw stream of a video into its own scratch directory.
+
+        This is the network-bound half of :meth:`get_audio`; pass the result
+        to :meth:`commit` (possibly in another process) to decode and cache it.
+        With a ``window`` only the prefix covering it is fetched, unless
+        ``ranged`` is False; download again that way when :meth:`commit`
+        raises :class:`TruncatedStreamError`.
+        """
+        audio_stream = self._select_stream(video_id)
+        scratch_dir = tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir)
+        try:
+            if window and ranged:
+                stream_path, partial = self._download_window(
+                    audio_stream, window, scratch_dir
+                )
+            else:
+                stream_path, partial = self._download(audio_stream, scratch_dir), False
+        except Exception:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+            raise
+
+        return StagedStream(
+            video_id=video_id,
+            itag=audio_stream.itag,
+            abr=audio_stream.abr,
+            scratch_dir=scratch_dir,
+            stream_path=stream_path,
+            partial=partial,
+            window=window,
+        )
+
+    def commit(self, staged: StagedStream) -> CachedAudio:
+        """
+        Decodes a staged stream and moves it into the cache.
+
+        This is the CPU-bound half of :meth:`get_audio` and never touches the
+        network: a ranged prefix too short to cover its window raises
+        :class:`TruncatedStreamError` instead.
+        """
+        window = staged.window
+        entry_key = self._entry_key(staged.video_id, staged.itag, window)
+        entry_dir = self._entry_dir(entry_key)
+        try:
+            # Decode once and persist the PCM next to the raw stream
+            stream_path = staged.stream_path
+            try:
+                y, sr = self._decode(stream_path, window)
+            except Exception:
+                if not staged.partial:
+                    raise
+                # The truncated prefix did not decode at all
+                y, sr = np.empty(0, dtype=np.float32), None
+            if window and staged.partial and len(y) < self._min_window_samples(window):
+                raise TruncatedStreamError(
+                    f"Stream prefix of {staged.video_id} ends before the window"
+                )
+            if window and len(y) < self._min_window_samples(window):
+                # Track is shorter than offset + duration; analyze its start
+                y, sr = self._decode(stream_path, window, offset=0.0)
+            np.save(os.path.join(staged.scratch_dir, "pcm.npy"), y.astype(np.float32))
+
+            meta = {
+                "video_id": staged.video_id,
+                "itag": staged.itag,
+                "abr": staged.abr,
+                "sample_rate": sr,
+                "window": asdict(window) if window else None,
+            }
+            with open(os.path.join(staged.scratch_dir, "meta.json"), "w") as f:
+                json.dump(meta, f)
+
+            with self._key_lock(entry_key):
+                os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                os.replace(staged.scratch_dir, entry_dir)
+                self._write_alias(staged.video_id, staged.itag)
+        finally:
+            self.discard(staged)
+
+        self._evict(keep=entry_key)
+        return self._lookup(staged.video_id, staged.itag, window)
+
+    def discard(self, staged: StagedStream) -> None:
+        """Removes the scratch files of a staged stream."""
+        shutil.rmtree(staged.scratch_dir, ignore_errors=True)
+
+    def open_pcm(
+        self, handle: str, offset: float = 0.0, duration: Optional[float] = None
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Opens a slice of the decoded PCM named by ``handle`` without copying.
+
+        Returns a read-only memory-mapped view and its sample rate.
+        """
+        audio = self.get_by_handle(handle)
+        pcm, sr = audio.load(), audio.sample_rate
+
+        start = int(offset * sr)
+        stop = None if duration is None else start + int(duration * sr)
+        return pcm[start:stop], sr
+
+    def get_by_handle(self, handle: str) -> CachedAudio:
+        """Returns the cached entry named by a PCM handle."""
+        if not is_valid_handle(handle):
+            raise ValueError(f"Invalid PCM handle: {handle!r}")
+        cached = self._lookup_handle(handle)
+        if not cached:
+            raise KeyError(f"Unknown PCM handle: {handle}")
+        return cached
+
+    def clear(self) -> None:
+        """Removes every cached entry."""
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            os.makedirs(os.path.join(self.cache_dir, "entries"), exist_ok=True)
+            os.makedirs(os.path.join(self.cache_dir, "aliases"), exist_ok=True)
+
+    def size_bytes(self) -> int:
+        """Returns the total size of all cached entries."""
+        return sum(size for _, _, size in self._entries())
+
+    def _select_stream(self, video_id: str):
+        try:
+            yt = YouTube(f"https://youtube.com/watch?v={video_id}")
+            audio_stream = yt.streams.filter(only_audio=True).first()
+        except Exception as youtube_error:
+            raise AudioFetchError(str(youtube_error)) from youtube_error
+
+        if not audio_stream:
+            raise NoAudioStreamError("No audio stream available for this video")
+        return audio_stream
+
+    def _download(self, audio_stream, scratch_dir: str) -> str:
+        try:
+            return audio_stream.download(
+                output_path=scratch_dir,
+                filename="stream",
+                skip_existing=False,
+                timeout=DOWNLOAD_TIMEOUT_SECONDS,
+            )
+        except Exception as youtube_error:
+            raise AudioFetchError(str(youtube_error)) from youtube_error
+
+    def _download_window(
+        self, audio_stream, window: AnalysisWindow, scratch_dir: str
+    ) -> tuple:
+        """Fetches the stream prefix that covers the window with a range request."""
+        bitrate = getattr(audio_stream, "bitrate", None)
+        if not bitrate:
+            return self._download(audio_stream, scratch_dir), False
+
+        end_byte = int(
+            (window.offset + window.duration) * bitrate / 8 * RANGE_HEADROOM_RATIO
+            + RANGE_HEADROOM_BYTES
+        )
+        stream_path = os.path.join(scratch_dir, "stream")
+        request = urllib.request.Request(
+            audio_stream.url, headers={"Range": f"bytes=0-{end_byte}"}
+        )
+        try:
+            with urllib.request.urlopen(
+                request, timeout=DOWNLOAD_TIMEOUT_SECONDS
+            ) as response, open(stream_path, "wb") as f:
+                shutil.copyfileobj(response, f)
+                # 206 means the server honoured the range
+                partial = response.status == 206
+        except (socket.timeout, TimeoutError) as timeout_error:
+            raise AudioFetchError(
+                f"Stream download timed out: {timeout_error}"
+            ) from timeout_error
+        except urllib.error.URLError as url_error:
+            if isinstance(url_error.reason, (socket.timeout, TimeoutError)):
+                raise AudioFetchError(
+                    f"Stream download timed out: {url_error.reason}"
+                ) from url_error
+            return self._download(audio_stream, scratch_dir), False
+        except Exception:
+            return self._download(audio_stream, scratch_dir), False
+        return stream_path, partial
+
+    @staticmethod
+    def _decode(
+        stream_path: str,
+        window: Optional[AnalysisWindow],
+        offset: Optional[float] = None,
+    ) -> tuple:
+        if not window:
+            return librosa.load(stream_path)
+        return librosa.load(
+            stream_path,
+            sr=window.sample_rate,
+            offset=window.offset if offset is None else offset,
+            duration=window.duration,
+        )
+
+    @staticmethod
+    def _min_window_samples(window: AnalysisWindow) -> int:
+        return int(window.duration * window.sample_rate * 0.9)
+
+    def _lookup(
+        self, video_id: str, itag: int, window: Optional[AnalysisWindow] = None
+    ) -> Optional[CachedAudio]:
+        return self._lookup_handle(self._entry_key(video_id, itag, window))
+
+    def _lookup_handle(self, handle: str) -> Optional[CachedAudio]:
+        # Handles come from tool input; never let one name a path outside
+        # the entries directory
+        if not is_valid_handle(handle):
+            return None
+        entry_dir = self._entry_dir(handle)
+        meta_path = os.path.join(entry_dir, "meta.json")
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        pcm_path = os.path.join(entry_dir, "pcm.npy")
+        stream_path = os.path.join(entry_dir, "stream")
+        if not os.path.exists(pcm_path):
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        now = time.time()
+        os.utime(meta_path, (now, now))
+
+        return CachedAudio(
+            video_id=meta["video_id"],
+            itag=meta["itag"],
+            abr=meta.get("abr"),
+            stream_path=stream_path,
+            pcm_path=pcm_path,
+            sample_rate=meta["sample_rate"],
+            window=AnalysisWindow(**meta["window"]) if meta.get("window") else None,
+        )
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, _, size in entries)
+            # Oldest access first
+            for key, _, size in sorted(entries, key=lambda entry: entry[1]):
+                if total <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+                total -= size
+
+    def _entries(self) -> List[tuple]:
+        entries = []
+        root = os.path.join(self.cache_dir, "entries")
+        for shard in os.listdir(root):
+            shard_dir = os.path.join(root, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for key in os.listdir(shard_dir):
+                entry_dir = os.path.join(shard_dir, key)
+                try:
+                    last_used = os.path.getmtime(os.path.join(entry_dir, "meta.json"))
+                    size = sum(
+                        os.path.getsize(os.path.join(entry_dir, name))
+                        for name in os.listdir(entry_dir)
+                    )
+                except OSError:
+                    continue
+                entries.append((key, last_used, size))
+        return entries
+
+    def _read_alias(self, video_id: str) -> Optional[int]:
+        try:
+            with open(os.path.join(self.cache_dir, "aliases", video_id)) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def _write_alias(self, video_id: str, itag: int) -> None:
+        alias_path = os.path.join(self.cache_dir, "aliases", video_id)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(alias_path))
+        with os.fdopen(fd, "w") as f:
+            f.write(str(itag))
+        os.replace(tmp_path, alias_path)
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, "entries", key[:2], key)
+
+    @staticmethod
+    def _entry_key(
+        video_id: str, itag: int, window: Optional[AnalysisWindow] = None
+    ) -> str:
+        window_key = window.key if window else "full"
+        return hashlib.sha1(f"{video_id}:{itag}:{window_key}".encode()).hexdigest()
+
+
+_audio_cache: Optional[AudioCache] = None
+_audio_cache_lock = threading.Lock()
+
+
+def get_audio_cache() -> AudioCache:
+    """Returns the process-wide audio cache."""
+    global _audio_cache
+    with _audio_cache_lock:
+        if _audio_cache is None:
+            _audio_cache = AudioCache()
+        return _audio_cache
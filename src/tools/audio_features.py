@@ -0,0 +1,219 @@
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import librosa
+import numpy as np
+
+from src.tools.audio_cache import CachedAudio
+
+N_FFT = 2048
+HOP_LENGTH = 512
+
+# Fast tempo mode: onset envelope frame rate (Hz) and the tempo search range
+FAST_FRAME_RATE = 43.0
+MIN_BPM = 60.0
+MAX_BPM = 200.0
+# Periods (in multiples of the beat period) used to refine the coarse estimate
+REFINE_HARMONICS = 4
+# Alternative octave counts as ambiguous above this fraction of the chosen score
+OCTAVE_AMBIGUITY_RATIO = 0.8
+
+
+@dataclass(frozen=True)
+class AudioDescriptors:
+    """Per-track audio descriptors shared by the music analysis tools."""
+
+    sample_rate: int
+    duration: float
+    tempo: float
+    rms_energy: float
+    zero_crossings: float
+    spectral_centroid: float
+    spectral_rolloff: float
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def extract_descriptors(
+    y: np.ndarray, sr: int, n_fft: int = N_FFT, hop_length: int = HOP_LENGTH
+) -> AudioDescriptors:
+    """
+    Computes every descriptor from a single STFT and onset envelope.
+
+    The magnitude spectrogram feeds RMS, spectral centroid, rolloff and the
+    mel onset envelope; the onset envelope in turn drives tempo estimation.
+    """
+    # One STFT for the whole track
+    S = np.abs(librosa.stft(y, n_fft=n_fft, hop_length=hop_length))
+
+    # RMS from the windowed spectrum reads low by the window's power; undo it
+    window_power = np.mean(librosa.filters.get_window("hann", n_fft) ** 2)
+    rms = librosa.feature.rms(S=S, frame_length=n_fft, hop_length=hop_length)
+    rms = rms / np.sqrt(window_power)
+    centroid = librosa.feature.spectral_centroid(
+        S=S, sr=sr, n_fft=n_fft, hop_length=hop_length
+    )
+    rolloff = librosa.feature.spectral_rolloff(
+        S=S, sr=sr, n_fft=n_fft, hop_length=hop_length
+    )
+
+    # Onset envelope from the same spectrogram, then tempo from the envelope
+    mel = librosa.feature.melspectrogram(S=S**2, sr=sr, n_fft=n_fft)
+    onset_env = librosa.onset.onset_strength(
+        S=librosa.power_to_db(mel), sr=sr, hop_length=hop_length
+    )
+    tempo, _ = librosa.beat.beat_track(
+        onset_envelope=onset_env, sr=sr, hop_length=hop_length
+    )
+
+    # Zero crossings are a time-domain measure; count them in one pass
+    zero_crossings = np.count_nonzero(np.diff(np.signbit(y))) / max(len(y), 1)
+
+    return AudioDescriptors(
+        sample_rate=sr,
+        duration=len(y) / sr,
+        tempo=float(np.atleast_1d(tempo)[0]),
+        rms_energy=float(rms.mean()),
+        zero_crossings=float(zero_crossings),
+        spectral_centroid=float(centroid.mean()),
+        spectral_rolloff=float(rolloff.mean()),
+    )
+
+
+@dataclass(frozen=True)
+class TempoEstimate:
+    """Tempo value together with the mode that produced it."""
+
+    bpm: float
+    mode: str
+    octave_ambiguity: Optional[dict] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def estimate_tempo_fast(
+    y: np.ndarray,
+    sr: int,
+    hop_length: Optional[int] = None,
+    min_bpm: float = MIN_BPM,
+    max_bpm: float = MAX_BPM,
+) -> TempoEstimate:
+    """
+    Estimates tempo only, without beat tracking.
+
+    A coarse period is picked from the autocorrelation of a downsampled onset
+    envelope, weighted by a log-normal prior around 120 BPM. The period is
+    then refined with sub-frame peak interpolation at its first few
+    multiples, where a frame of error is a smaller fraction of the lag; this
+    is usually within ±2 BPM. The relative score of the half- and
+    double-tempo alternatives is reported as octave ambiguity.
+    """
+    if hop_length is None:
+        # Power-of-two hop closest to FAST_FRAME_RATE at any sample rate
+        hop_length = 2 ** int(round(np.log2(sr / FAST_FRAME_RATE)))
+    onset_env = librosa.onset.onset_strength(
+        y=y, sr=sr, hop_length=hop_length, n_fft=2 * hop_length
+    )
+    frame_rate = sr / hop_length
+    onset_env = onset_env - onset_env.mean()
+
+    max_period = int(np.ceil(frame_rate * 60.0 / min_bpm))
+    ac = librosa.autocorrelate(
+        onset_env, max_size=min(len(onset_env), REFINE_HARMONICS * max_period + 2)
+    )
+    if len(ac) == 0 or ac[0] <= 0:
+        raise ValueError("Audio has no onsets to estimate tempo from")
+    ac = ac / ac[0]
+
+    # Coarse search over the allowed tempo range
+    min_period = max(int(np.floor(frame_rate * 60.0 / max_bpm)), 1)
+    periods = np.arange(min_period, min(max_period, len(ac) - 2) + 1)
+    if len(periods) == 0:
+        raise ValueError("Audio is too short to estimate tempo")
+    # A peak between two frames is split across them; score each lag by the
+    # positive mass around it so off-grid periods are not beaten by multiples
+    positive = np.clip(ac, 0.0, None)
+    peaks = positive[periods - 1] + positive[periods] + positive[periods + 1]
+    scores = peaks * _tempo_prior(60.0 * frame_rate / periods)
+    period = periods[np.argmax(scores)]
+
+    # Refine with interpolated peaks at multiples of the period
+    estimates, weights = [], []
+    for k in range(1, REFINE_HARMONICS + 1):
+        lo, hi = max(k * period - k, 1), min(k * period + k, len(ac) - 2)
+        if lo > hi:
+            break
+        peak = lo + int(np.argmax(ac[lo : hi + 1]))
+        offset = _parabolic_offset(ac[peak - 1], ac[peak], ac[peak + 1])
+        estimates.append((peak + offset) / k)
+        weights.append(k * max(ac[peak], 0.0))
+    refined = np.average(estimates, weights=weights) if sum(weights) > 0 else period
+    bpm = 60.0 * frame_rate / refined
+
+    # Compare the chosen octave with half and double tempo
+    chosen_score = _peak_mass(positive, refined) * _tempo_prior(bpm)
+    half_score = _peak_mass(positive, 2 * refined) * _tempo_prior(bpm / 2)
+    double_score = _peak_mass(positive, refined / 2) * _tempo_prior(bpm * 2)
+    half_ratio = half_score / chosen_score if chosen_score > 0 else 0.0
+    double_ratio = double_score / chosen_score if chosen_score > 0 else 0.0
+
+    return TempoEstimate(
+        bpm=float(bpm),
+        mode="fast",
+        octave_ambiguity={
+            "half_tempo": round(float(bpm / 2), 2),
+            "half_tempo_score": round(float(max(half_ratio, 0.0)), 2),
+            "double_tempo": round(float(bpm * 2), 2),
+            "double_tempo_score": round(float(max(double_ratio, 0.0)), 2),
+            "ambiguous": bool(max(half_ratio, double_ratio) >= OCTAVE_AMBIGUITY_RATIO),
+        },
+    )
+
+
+def estimate_tempo(y: np.ndarray, sr: int, mode: str = "full") -> TempoEstimate:
+    """Estimates tempo in ``fast`` (tempo only) or ``full`` (beat tracking) mode."""
+    if mode == "fast":
+        return estimate_tempo_fast(y, sr)
+    if mode == "full":
+        return TempoEstimate(bpm=extract_descriptors(y, sr).tempo, mode="full")
+    raise ValueError(f"Unknown tempo mode: {mode}")
+
+
+def _tempo_prior(bpm):
+    # Log-normal prior centred on 120 BPM with a one-octave deviation
+    return np.exp(-0.5 * np.log2(np.asarray(bpm) / 120.0) ** 2)
+
+
+def _parabolic_offset(left: float, center: float, right: float) -> float:
+    denominator = left - 2 * center + right
+    if denominator == 0:
+        return 0.0
+    return float(np.clip(0.5 * (left - right) / denominator, -0.5, 0.5))
+
+
+def _peak_mass(positive: np.ndarray, position: float) -> float:
+    center = int(round(position))
+    if center < 1 or center > len(positive) - 2:
+        return 0.0
+    return float(positive[center - 1 : center + 2].sum())
+
+
+def get_descriptors(audio: CachedAudio) -> AudioDescriptors:
+    """Returns the descriptors of a cached track, computing them once."""
+    descriptors_path = os.path.join(os.path.dirname(audio.pcm_path), "descriptors.json")
+    try:
+        with open(descriptors_path) as f:
+            return AudioDescriptors(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        pass
+
+    descriptors = extract_descriptors(audio.load(), audio.sample_rate)
+    tmp_path = f"{descriptors_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(descriptors.to_dict(), f)
+    os.replace(tmp_path, descriptors_path)
+    return descriptors
@@ -0,0 +1,20 @@
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+from src.tools.analysis_pipeline import AnalysisPipeline
+from src.tools.audio_cache import AnalysisWindow
+
+
+def analyze_batch(
+    video_ids: Iterable[str],
+    max_workers: Optional[int] = None,
+    window: Optional[AnalysisWindow] = None,
+) -> Iterator[Tuple[str, Union[dict, str]]]:
+    """
+    Analyzes many videos across a process pool sized to the available cores.
+
+    Yields ``(video_id, result)`` pairs as soon as each track finishes, in
+    completion order. Duplicate IDs are analyzed once. Downloads overlap
+    analysis through :class:`AnalysisPipeline`.
+    """
+    pipeline = AnalysisPipeline(analysis_workers=max_workers, window=window)
+    yield from pipeline.run(video_ids)
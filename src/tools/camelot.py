@@ -0,0 +1,113 @@
+import re
+from functools import lru_cache
+from typing import Iterable, Optional
+
+import numpy as np
+
+# Keys are indexed by Camelot position: 2 * (number - 1), plus 1 for the
+# major (B) side, so 8A (A minor) is 14 and 8B (C major) is 15
+KEY_COUNT = 24
+# Index of keys that are missing or not recognised
+UNKNOWN_KEY = KEY_COUNT
+
+PITCH_CLASSES = {"c": 0, "d": 2, "e": 4, "f": 5, "g": 7, "a": 9, "b": 11}
+ACCIDENTALS = {"#": 1, "♯": 1, "b": -1, "♭": -1}
+MINOR_SUFFIXES = {"m", "min", "minor", "mi", "-"}
+MAJOR_SUFFIXES = {"", "maj", "major"}
+
+# Scores by relation on the wheel; anything below 0.7 counts as a clash
+SAME_KEY_SCORE = 1.0
+NEIGHBOUR_SCORE = 0.9  # One step around the wheel, or the relative key
+DIAGONAL_SCORE = 0.75  # One step around and switching major/minor
+ENERGY_BOOST_SCORE = 0.7  # Two steps around, same mode
+CLASH_SCORE = 0.4
+UNKNOWN_SCORE = 0.5
+
+_CAMELOT_PATTERN = re.compile(r"^(1[0-2]|0?[1-9])\s*([ab])$", re.IGNORECASE)
+_NOTE_PATTERN = re.compile(r"^([a-g])\s*([#♯b♭]?)\s*(.*)$", re.IGNORECASE)
+
+
+def camelot_index(number: int, major: bool) -> int:
+    """Index of a Camelot key such as 8A (``number=8, major=False``)."""
+    return 2 * (number - 1) + int(major)
+
+
+def camelot_name(index: int) -> str:
+    """Camelot notation of a key index, e.g. ``"8A"``."""
+    return f"{index // 2 + 1}{'B' if index % 2 else 'A'}"
+
+
+@lru_cache(maxsize=1024)
+def normalize_key(key: Optional[str]) -> int:
+    """
+    Maps a key in Camelot ("8A") or note ("Am", "A minor", "C#", "Bb maj")
+    notation to its index, or ``UNKNOWN_KEY`` when it is not recognised.
+    """
+    if not key:
+        return UNKNOWN_KEY
+    key = key.strip()
+
+    camelot = _CAMELOT_PATTERN.match(key)
+    if camelot:
+        return camelot_index(int(camelot.group(1)), camelot.group(2).lower() == "b")
+
+    note = _NOTE_PATTERN.match(key)
+    if not note:
+        return UNKNOWN_KEY
+    letter, accidental, suffix = note.groups()
+    suffix = suffix.strip()
+    # "AM" is A major, "Am" is A minor
+    if suffix == "M" or suffix.lower() in MAJOR_SUFFIXES:
+        minor = False
+    elif suffix.lower() in MINOR_SUFFIXES:
+        minor = True
+    else:
+        return UNKNOWN_KEY
+
+    pitch = PITCH_CLASSES[letter.lower()] + ACCIDENTALS.get(accidental.lower(), 0)
+    # Minor keys share their Camelot number with the relative major
+    major_pitch = (pitch + 3) % 12 if minor else pitch % 12
+    number = (7 * major_pitch + 7) % 12 + 1
+    return camelot_index(number, not minor)
+
+
+def key_codes(keys: Iterable[Optional[str]]) -> np.ndarray:
+    """Normalizes many keys into an array of indices."""
+    return np.fromiter((normalize_key(key) for key in keys), dtype=np.intp)
+
+
+def _build_table() -> np.ndarray:
+    index = np.arange(KEY_COUNT)
+    number, major = index // 2, index % 2
+    steps = np.abs(number[:, None] - number[None, :])
+    steps = np.minimum(steps, 12 - steps)
+    same_mode = major[:, None] == major[None, :]
+
+    table = np.full((KEY_COUNT + 1, KEY_COUNT + 1), UNKNOWN_SCORE)
+    table[:KEY_COUNT, :KEY_COUNT] = np.select(
+        [
+            same_mode & (steps == 0),
+            (same_mode & (steps == 1)) | (~same_mode & (steps == 0)),
+            ~same_mode & (steps == 1),
+            same_mode & (steps == 2),
+        ],
+        [SAME_KEY_SCORE, NEIGHBOUR_SCORE, DIAGONAL_SCORE, ENERGY_BOOST_SCORE],
+        CLASH_SCORE,
+    )
+    table.flags.writeable = False
+    return table
+
+
+# Scores indexed by two key indices; the extra row and column are for
+# UNKNOWN_KEY, so unknown keys need no special case
+COMPATIBILITY_TABLE = _build_table()
+
+
+def key_compatibility(key1: Optional[str], key2: Optional[str]) -> float:
+    """Harmonic mixing score of two keys in any supported notation."""
+    return float(COMPATIBILITY_TABLE[normalize_key(key1), normalize_key(key2)])
+
+
+def compatibility_matrix(codes: np.ndarray) -> np.ndarray:
+    """All-pairs scores of the keys in ``codes``, as one table lookup."""
+    return COMPATIBILITY_TABLE[np.ix_(codes, codes)]
@@ -0,0 +1,128 @@
+import re
+from typing import Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from src.tools.audio_features import AudioDescriptors
+from src.tools.parameter_tools import GENRE_MAPPINGS
+
+# Descriptor columns of the feature matrix, in order
+FEATURES = (
+    "tempo",
+    "spectral_centroid",
+    "spectral_rolloff",
+    "rms_energy",
+    "zero_crossings",
+)
+# Descriptors reported per sample that are scored per second, so the
+# prototypes hold at any sample rate
+PER_SECOND_FEATURES = ("zero_crossings",)
+
+# Typical descriptor values per main genre, in FEATURES order; zero crossings
+# are per second
+GENRE_PROTOTYPES = {
+    "rock": (120.0, 2500.0, 5000.0, 0.15, 1760.0),
+    "pop": (118.0, 2200.0, 4500.0, 0.14, 1540.0),
+    "hip hop": (92.0, 1800.0, 3800.0, 0.16, 1320.0),
+    "electronic": (126.0, 2600.0, 5500.0, 0.17, 1760.0),
+    "country": (110.0, 1900.0, 4000.0, 0.12, 1320.0),
+    "latin": (100.0, 2100.0, 4300.0, 0.14, 1540.0),
+    "jazz": (110.0, 1600.0, 3300.0, 0.09, 1100.0),
+    "classical": (85.0, 1400.0, 2800.0, 0.06, 880.0),
+}
+
+# How far a feature may stray from the prototype before confidence halves
+FEATURE_TOLERANCES = (25.0, 700.0, 1500.0, 0.06, 660.0)
+FEATURE_WEIGHTS = (1.0, 1.0, 1.0, 0.5, 0.5)
+
+# Confidence for genres without a prototype, matching the old base score
+NEUTRAL_CONFIDENCE = 0.5
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(name: str) -> tuple:
+    return tuple(_TOKEN_PATTERN.findall(name.lower()))
+
+
+class GenreScorer:
+    """
+    Scores tracks against every genre prototype at once.
+
+    Each genre of ``GENRE_MAPPINGS`` has a prototype descriptor vector;
+    subgenres share their parent's prototype. Confidence decays with the
+    weighted, tolerance-scaled distance between a track and a prototype, and
+    an N-tracks × G-genres matrix is scored with one broadcast operation.
+    """
+
+    def __init__(self):
+        self.genres: List[str] = list(GENRE_PROTOTYPES)
+        self.prototypes = np.array(
+            [GENRE_PROTOTYPES[genre] for genre in self.genres], dtype=np.float64
+        )
+        self.tolerances = np.array(FEATURE_TOLERANCES, dtype=np.float64)
+        self.weights = np.array(FEATURE_WEIGHTS, dtype=np.float64)
+        self.weights /= self.weights.sum()
+
+        # Map every main genre and subgenre name to a prototype row
+        self._index = {genre: row for row, genre in enumerate(self.genres)}
+        for genre, subgenres in GENRE_MAPPINGS.items():
+            for subgenre in subgenres:
+                self._index.setdefault(subgenre.lower(), self._index[genre])
+        self._index_tokens = [(_tokens(name), row) for name, row in self._index.items()]
+
+    def resolve(self, genre: str) -> Optional[int]:
+        """
+        Returns the prototype row of a genre or subgenre name.
+
+        Names that are not known exactly resolve to the longest known name
+        whose words appear in them as a run ("dark synth pop" → "synth pop"),
+        or to ``None``; parts of words never match ("trap" is not "rap").
+        """
+        genre_lower = genre.lower().strip()
+        candidates = (genre_lower, genre_lower.replace("-", " "))
+        for candidate in candidates:
+            if candidate in self._index:
+                return self._index[candidate]
+
+        tokens = _tokens(genre_lower)
+        best, best_length = None, 0
+        for name_tokens, row in self._index_tokens:
+            n = len(name_tokens)
+            if n > best_length and any(
+                tokens[i : i + n] == name_tokens for i in range(len(tokens) - n + 1)
+            ):
+                best, best_length = row, n
+        return best
+
+    @staticmethod
+    def feature_matrix(
+        descriptors: Iterable[Union[AudioDescriptors, dict]],
+    ) -> np.ndarray:
+        """Stacks descriptor records into an N × F feature matrix."""
+        names = FEATURES + ("sample_rate",)
+        rows = [
+            [(d[f] if isinstance(d, dict) else getattr(d, f)) or 0.0 for f in names]
+            for d in descriptors
+        ]
+        matrix = np.array(rows, dtype=np.float64).reshape(len(rows), len(names))
+        features, sample_rates = matrix[:, :-1], matrix[:, -1:]
+        per_second = [FEATURES.index(f) for f in PER_SECOND_FEATURES]
+        features[:, per_second] *= sample_rates
+        return features
+
+    def score_all(self, features: np.ndarray) -> np.ndarray:
+        """Returns the N × G confidence matrix against every prototype."""
+        z = (features[:, None, :] - self.prototypes[None, :, :]) / self.tolerances
+        distance = np.einsum("ngf,f->ng", z**2, self.weights)
+        return np.exp(-np.log(2.0) * distance)
+
+    def score(self, features: np.ndarray, genres: Sequence[str]) -> np.ndarray:
+        """Returns the N × len(genres) confidence matrix for requested genres."""
+        rows = [self.resolve(genre) for genre in genres]
+        known = np.array([row is not None for row in rows], dtype=bool)
+        columns = np.array([row if row is not None else 0 for row in rows], dtype=int)
+
+        confidence = self.score_all(features)[:, columns]
+        confidence[:, ~known] = NEUTRAL_CONFIDENCE
+        return confidence
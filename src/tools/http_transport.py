@@ -0,0 +1,145 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from urllib.parse import urlsplit
+
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
+
+DEFAULT_POOL_SIZE = int(os.getenv("PLAI_HTTP_POOL_SIZE", "16"))
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("PLAI_HTTP_TIMEOUT", "30"))
+# How long a request may wait for a free transport before failing
+DEFAULT_ACQUIRE_TIMEOUT_SECONDS = 60.0
+
+
+class _KeepAliveHttp(httplib2.Http):
+    """httplib2 transport that counts how often it reuses an open connection."""
+
+    def __init__(self, pool: "HttpPool", timeout: float):
+        super().__init__(timeout=timeout)
+        # 308 is used for resumable uploads, not redirects (as in build_http)
+        self.redirect_codes = self.redirect_codes - {308}
+        self._pool = pool
+
+    def request(self, uri, *args, **kwargs):
+        parts = urlsplit(uri)
+        connection_key = f"{parts.scheme}:{parts.netloc}"
+        self._pool._record_request(connection_key in self.connections)
+        return super().request(uri, *args, **kwargs)
+
+
+class HttpPool:
+    """
+    Bounded pool of keep-alive httplib2 transports shared by all threads.
+
+    httplib2 transports are not thread-safe, so each request borrows one
+    for its duration. Transports keep their connections open between
+    requests, so most calls skip TCP and TLS setup. ``stats()`` reports how
+    often connections were reused.
+    """
+
+    def __init__(
+        self,
+        size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT_SECONDS,
+    ):
+        self.size = size
+        self.timeout = timeout
+        self.acquire_timeout = acquire_timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._acquisitions = 0
+        self._waits = 0
+        self._requests = 0
+        self._reused_connections = 0
+
+    @contextmanager
+    def acquire(self, shared_http=None) -> Iterator[httplib2.Http]:
+        """
+        Borrows a transport for one request.
+
+        When ``shared_http`` is an ``AuthorizedHttp``, the transport is
+        wrapped with the same credentials.
+        """
+        http = self._take()
+        try:
+            if isinstance(shared_http, AuthorizedHttp):
+                yield AuthorizedHttp(shared_http.credentials, http=http)
+            else:
+                yield http
+        finally:
+            self._idle.put(http)
+
+    def stats(self) -> dict:
+        """Returns pool occupancy and connection reuse counters."""
+        with self._lock:
+            idle = self._idle.qsize()
+            requests = self._requests
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": idle,
+                "in_use": self._created - idle,
+                "acquisitions": self._acquisitions,
+                "waits": self._waits,
+                "requests": self._requests,
+                "reused_connections": self._reused_connections,
+                "new_connections": self._requests - self._reused_connections,
+                "reuse_rate": self._reused_connections / requests if requests else 0.0,
+            }
+
+    def close_idle(self) -> None:
+        """Closes the open connections of every idle transport."""
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for http in idle:
+            http.close()
+            self._idle.put(http)
+
+    def _take(self) -> httplib2.Http:
+        with self._lock:
+            self._acquisitions += 1
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return _KeepAliveHttp(self, self.timeout)
+            self._waits += 1
+
+        try:
+            return self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No HTTP transport free after {self.acquire_timeout:.0f}s "
+                f"(pool size {self.size})"
+            ) from None
+
+    def _record_request(self, reused: bool) -> None:
+        with self._lock:
+            self._requests += 1
+            self._reused_connections += reused
+
+
+_http_pool: Optional[HttpPool] = None
+_http_pool_lock = threading.Lock()
+
+
+def get_http_pool() -> HttpPool:
+    """Returns the process-wide HTTP transport pool."""
+    global _http_pool
+    with _http_pool_lock:
+        if _http_pool is None:
+            _http_pool = HttpPool()
+        return _http_pool
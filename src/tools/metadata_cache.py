@@ -0,0 +1,175 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional
+
+from src.tools.youtube_service import execute
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "PLAI_METADATA_CACHE_PATH", os.path.join(".plai_cache", "metadata.sqlite3")
+)
+
+# videos().list accepts at most 50 IDs per request
+MAX_IDS_PER_REQUEST = 50
+
+# How long each part of a video resource stays fresh, in seconds
+PART_TTLS = {
+    "snippet": 7 * 24 * 3600,
+    "contentDetails": 7 * 24 * 3600,
+    "status": 24 * 3600,
+    "statistics": 3600,
+}
+
+# Partial-response fields fetched for each part
+PART_FIELDS = {
+    "snippet": "snippet(title,description,tags,publishedAt,defaultLanguage)",
+    "contentDetails": "contentDetails(duration,regionRestriction)",
+    "status": "status(uploadStatus,privacyStatus,embeddable)",
+    "statistics": "statistics(viewCount,likeCount,commentCount)",
+}
+
+
+class VideoResourceCache:
+    """
+    SQLite-backed cache of ``videos().list`` resources, stored per part.
+
+    Every part has its own TTL: long for snippet and contentDetails, short
+    for statistics. Entries survive across runs.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttls: Optional[dict] = None):
+        self.path = path
+        self.ttls = {**PART_TTLS, **(ttls or {})}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS video_parts ("
+                " video_id TEXT NOT NULL,"
+                " part TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " PRIMARY KEY (video_id, part))"
+            )
+
+    def get(self, video_ids: Iterable[str], parts: Iterable[str]) -> Dict[str, dict]:
+        """
+        Returns the fresh cached parts of each video.
+
+        The result maps every video ID to a partial resource holding only the
+        parts that are cached and within their TTL.
+        """
+        video_ids, parts = list(video_ids), list(parts)
+        now = time.time()
+        resources = {video_id: {"id": video_id} for video_id in video_ids}
+
+        with closing(self._connect()) as conn:
+            for i in range(0, len(video_ids), 500):
+                batch = video_ids[i : i + 500]
+                rows = conn.execute(
+                    "SELECT video_id, part, data, fetched_at FROM video_parts"
+                    f" WHERE video_id IN ({','.join('?' * len(batch))})"
+                    f" AND part IN ({','.join('?' * len(parts))})",
+                    [*batch, *parts],
+                ).fetchall()
+                for video_id, part, data, fetched_at in rows:
+                    if now - fetched_at <= self.ttls.get(part, 0):
+                        resources[video_id][part] = json.loads(data)
+
+        return resources
+
+    def put(self, resources: Iterable[dict], parts: Iterable[str]) -> None:
+        """Stores the given parts of each resource."""
+        now = time.time()
+        rows = [
+            (resource["id"], part, json.dumps(resource.get(part, {})), now)
+            for resource in resources
+            for part in parts
+        ]
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO video_parts VALUES (?, ?, ?, ?)", rows
+            )
+
+    def clear(self) -> None:
+        """Removes every cached entry."""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM video_parts")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+
+def fetch_videos(
+    youtube,
+    video_ids: Iterable[str],
+    parts: Iterable[str],
+    cache: Optional[VideoResourceCache] = None,
+) -> Dict[str, dict]:
+    """
+    Returns video resources with the requested parts, keyed by video ID.
+
+    Cached parts are served from ``cache``. Gaps are filled with a single
+    merged request per 50 IDs that also refreshes every other stale part
+    the tools use, since ``videos().list`` costs the same whatever parts it
+    returns. Videos the API does not return are left out.
+    """
+    cache = cache or get_metadata_cache()
+    parts = list(parts)
+    unique_ids = list(dict.fromkeys(video_ids))
+    resources = cache.get(unique_ids, PART_TTLS)
+
+    missing_ids = [
+        video_id
+        for video_id in unique_ids
+        if any(part not in resources[video_id] for part in parts)
+    ]
+    if missing_ids:
+        # Refresh all stale parts of the missing videos in one go
+        stale_parts = [
+            part
+            for part in PART_TTLS
+            if any(part not in resources[video_id] for video_id in missing_ids)
+        ]
+        fetched = _list_videos(youtube, missing_ids, stale_parts)
+        cache.put(fetched, stale_parts)
+        for video in fetched:
+            resources[video["id"]].update(video)
+
+    return {
+        video_id: {"id": video_id, **{part: resource[part] for part in parts}}
+        for video_id, resource in resources.items()
+        if all(part in resource for part in parts)
+    }
+
+
+def _list_videos(youtube, video_ids: List[str], parts: List[str]) -> List[dict]:
+    fields = "items(id," + ",".join(PART_FIELDS[part] for part in parts) + ")"
+    videos = []
+    for i in range(0, len(video_ids), MAX_IDS_PER_REQUEST):
+        batch = video_ids[i : i + MAX_IDS_PER_REQUEST]
+        response = execute(
+            youtube.videos().list(
+                part=",".join(parts),
+                id=",".join(batch),
+                fields=fields,
+            )
+        )
+        videos.extend(response.get("items", []))
+    return videos
+
+
+_metadata_cache: Optional[VideoResourceCache] = None
+_metadata_cache_lock = threading.Lock()
+
+
+def get_metadata_cache() -> VideoResourceCache:
+    """Returns the process-wide video resource cache."""
+    global _metadata_cache
+    with _metadata_cache_lock:
+        if _metadata_cache is None:
+            _metadata_cache = VideoResourceCache()
+        return _metadata_cache
@@ -1,142 +1,330 @@
-from typing import Type
+import asyncio
+from typing import List, Optional, Type, Union
 
-import librosa
 import numpy as np
 from crewai_tools import BaseTool
 from pydantic import BaseModel, Field
-from pytube import YouTube
+
+from src.tools.async_runtime import AsyncToolMixin, run_blocking, run_sync
+from src.tools.audio_cache import (
+    AnalysisWindow,
+    AudioFetchError,
+    CachedAudio,
+    NoAudioStreamError,
+    get_audio_cache,
+    is_valid_handle,
+)
+from src.tools.audio_features import estimate_tempo, get_descriptors
+from src.tools.batch_analysis import analyze_batch
+from src.tools.genre_scoring import GenreScorer
+
+DEFAULT_SAMPLE_RATE = 22050
+
+# Fast mode: analyze a 30 s excerpt starting 30 s in, at 22.05 kHz
+FAST_ANALYSIS_WINDOW = AnalysisWindow(offset=30.0, duration=30.0, sample_rate=22050)
+FAST_FIELD_DESCRIPTION = (
+    "Analyze a 30 s excerpt instead of the whole track; much quicker, with "
+    "tempo usually within ±2 BPM of the full-track value"
+)
+
+
+def fetch_audio(
+    video_id: Optional[str],
+    pcm_handle: Optional[str],
+    window: Optional[AnalysisWindow] = None,
+) -> Union[CachedAudio, str]:
+    """Returns cached audio for a handle or video ID, or an error string."""
+    # Validate video ID
+    if not pcm_handle and (not video_id or len(video_id) != 11):
+        return "Error: Invalid YouTube video ID"
+    if pcm_handle and not is_valid_handle(pcm_handle):
+        return "Error: Invalid PCM handle"
+
+    # Download and decode audio (shared cache)
+    try:
+        if pcm_handle:
+            return get_audio_cache().get_by_handle(pcm_handle)
+        return get_audio_cache().get_audio(video_id, window)
+    except NoAudioStreamError:
+        return "Error: No audio stream available for this video"
+    except AudioFetchError as youtube_error:
+        return f"YouTube Error: {str(youtube_error)}"
+
+
+def select_window(
+    fast: bool, window: Optional[AnalysisWindow]
+) -> Optional[AnalysisWindow]:
+    """The window a tool analyzes: the fast excerpt, or its configured window."""
+    return FAST_ANALYSIS_WINDOW if fast else window
 
 
 class BPMDetectionInput(BaseModel):
     """Input schema for BPM detection."""
 
-    audio_sample: bytes = Field(
-        ..., description="Raw audio sample bytes to analyze for tempo detection"
+    audio_sample: Optional[bytes] = Field(
+        None, description="Raw audio sample bytes to analyze for tempo detection"
+    )
+    pcm_handle: Optional[str] = Field(
+        None,
+        description="Handle of decoded audio in the PCM store, as returned by "
+        "the audio analyzers; used instead of audio_sample",
+    )
+    offset: float = Field(
+        0.0, description="Start of the slice to analyze, in seconds (pcm_handle only)"
+    )
+    duration: Optional[float] = Field(
+        None, description="Length of the slice to analyze, in seconds (pcm_handle only)"
+    )
+    mode: str = Field(
+        "full",
+        description="'fast' estimates tempo only (about ±2 BPM, reports half/double "
+        "tempo ambiguity); 'full' runs complete beat tracking",
     )
 
 
 class AudioQualityInput(BaseModel):
     """Input schema for audio quality analysis."""
 
-    video_id: str = Field(..., description="Video ID to analyze audio quality metrics")
+    video_id: Optional[str] = Field(
+        None, description="Video ID to analyze audio quality metrics"
+    )
+    pcm_handle: Optional[str] = Field(
+        None, description="Handle of already decoded audio to analyze instead"
+    )
+    fast: bool = Field(False, description=FAST_FIELD_DESCRIPTION)
 
 
 class GenreConfidenceInput(BaseModel):
     """Input schema for genre confidence calculation."""
 
-    video_id: str = Field(..., description="Video ID to analyze")
+    video_id: Optional[str] = Field(None, description="Video ID to analyze")
     expected_genre: str = Field(
         ..., description="Expected genre to calculate confidence against"
     )
+    pcm_handle: Optional[str] = Field(
+        None, description="Handle of already decoded audio to analyze instead"
+    )
+    fast: bool = Field(False, description=FAST_FIELD_DESCRIPTION)
+
+
+class BatchAudioAnalysisInput(BaseModel):
+    """Input schema for batch audio analysis."""
+
+    video_ids: List[str] = Field(
+        ..., description="List of video IDs to analyze in parallel"
+    )
+    fast: bool = Field(False, description=FAST_FIELD_DESCRIPTION)
+
+
+class GenreConfidenceMatrixInput(BaseModel):
+    """Input schema for scoring many tracks against many genres."""
+
+    video_ids: List[str] = Field(..., description="List of video IDs to score")
+    genres: List[str] = Field(
+        ..., description="List of genres or subgenres to score every track against"
+    )
+    fast: bool = Field(False, description=FAST_FIELD_DESCRIPTION)
 
 
 class BPMDetectionTool(BaseTool):
     name: str = "BPM Detector"
     description: str = (
         "Analyzes an audio sample to detect its tempo/BPM (Beats Per Minute). "
-        "Useful for tempo-based music analysis and matching."
+        "Useful for tempo-based music analysis and matching. Use mode 'fast' "
+        "when about ±2 BPM is enough, e.g. for tempo-range filtering."
     )
     args_schema: Type[BaseModel] = BPMDetectionInput
 
-    def _run(self, audio_sample: bytes) -> float:
+    def _run(
+        self,
+        audio_sample: Optional[bytes] = None,
+        pcm_handle: Optional[str] = None,
+        offset: float = 0.0,
+        duration: Optional[float] = None,
+        mode: str = "full",
+    ) -> dict:
         try:
-            # Convert bytes to numpy array
-            audio_data = np.frombuffer(audio_sample, dtype=np.float32)
+            if pcm_handle:
+                # Zero-copy slice of the memory-mapped PCM store
+                audio_data, sr = get_audio_cache().open_pcm(
+                    pcm_handle, offset, duration
+                )
+            elif audio_sample:
+                # Convert bytes to numpy array
+                audio_data = np.frombuffer(audio_sample, dtype=np.float32)
+                sr = DEFAULT_SAMPLE_RATE
+            else:
+                return "Error: Provide either audio_sample or pcm_handle"
+
+            if mode not in ("fast", "full"):
+                return "Error: Mode must be 'fast' or 'full'"
 
-            # Detect tempo using librosa
-            tempo, _ = librosa.beat.beat_track(y=audio_data)
-            return round(tempo, 2)
+            # Fast mode skips beat tracking; full mode uses the descriptor engine
+            estimate = estimate_tempo(audio_data, sr, mode)
+            return {**estimate.to_dict(), "bpm": round(estimate.bpm, 2)}
         except Exception as e:
             return f"Error detecting BPM: {str(e)}"
 
 
-class AudioQualityTool(BaseTool):
+class AudioQualityTool(AsyncToolMixin, BaseTool):
     name: str = "Audio Quality Analyzer"
     description: str = (
         "Analyzes audio stream quality metrics including bitrate, dynamic range, "
         "noise levels, and overall audio clarity score."
     )
     args_schema: Type[BaseModel] = AudioQualityInput
+    analysis_window: Optional[AnalysisWindow] = None
 
-    def _run(self, video_id: str) -> dict:
+    def _run(
+        self,
+        video_id: Optional[str] = None,
+        pcm_handle: Optional[str] = None,
+        fast: bool = False,
+    ) -> dict:
+        # Download on the shared event loop's I/O pool
+        return run_sync(self._arun(video_id, pcm_handle, fast))
+
+    async def _arun(
+        self,
+        video_id: Optional[str] = None,
+        pcm_handle: Optional[str] = None,
+        fast: bool = False,
+    ) -> dict:
         try:
-            # Validate video ID
-            if not video_id or len(video_id) != 11:
-                return "Error: Invalid YouTube video ID"
-
-            # Download audio from YouTube
-            try:
-                yt = YouTube(f"https://youtube.com/watch?v={video_id}")
-                audio_stream = yt.streams.filter(only_audio=True).first()
-                if not audio_stream:
-                    return "Error: No audio stream available for this video"
-                audio_path = audio_stream.download(filename="temp_audio")
-            except Exception as youtube_error:
-                return f"YouTube Error: {str(youtube_error)}"
-
-            # Load audio and analyze
-            y, sr = librosa.load(audio_path)
-
-            # Basic quality metrics
-            return {
-                "bitrate": audio_stream.abr,
-                "sample_rate": sr,
-                "duration": len(y) / sr,
-                "rms_energy": float(librosa.feature.rms(y=y).mean()),
-                "zero_crossings": float(librosa.feature.zero_crossing_rate(y).mean()),
-            }
+            # Download on the shared I/O pool, analyze off the event loop
+            window = select_window(fast, self.analysis_window)
+            audio = await run_blocking(fetch_audio, video_id, pcm_handle, window)
+            if isinstance(audio, str):
+                return audio
+            return await asyncio.to_thread(self._analyze, audio)
         except Exception as e:
             return f"Error analyzing audio quality: {str(e)}"
 
+    @staticmethod
+    def _analyze(audio: CachedAudio) -> dict:
+        # Single-pass descriptor extraction
+        descriptors = get_descriptors(audio)
 
-class GenreConfidenceTool(BaseTool):
+        # Basic quality metrics
+        return {
+            "pcm_handle": audio.handle,
+            "bitrate": audio.abr,
+            "sample_rate": descriptors.sample_rate,
+            "duration": descriptors.duration,
+            "rms_energy": descriptors.rms_energy,
+            "zero_crossings": descriptors.zero_crossings,
+        }
+
+
+class GenreConfidenceTool(AsyncToolMixin, BaseTool):
     name: str = "Genre Confidence Calculator"
     description: str = (
         "Calculates a confidence score for how well a track matches an "
         "expected genre classification."
     )
     args_schema: Type[BaseModel] = GenreConfidenceInput
+    analysis_window: Optional[AnalysisWindow] = None
 
-    def _run(self, video_id: str, expected_genre: str) -> float:
+    def _run(
+        self,
+        video_id: Optional[str] = None,
+        expected_genre: str = "",
+        pcm_handle: Optional[str] = None,
+        fast: bool = False,
+    ) -> float:
+        # Download on the shared event loop's I/O pool
+        return run_sync(self._arun(video_id, expected_genre, pcm_handle, fast))
+
+    async def _arun(
+        self,
+        video_id: Optional[str] = None,
+        expected_genre: str = "",
+        pcm_handle: Optional[str] = None,
+        fast: bool = False,
+    ) -> float:
         try:
-            # Validate inputs
-            if not video_id or len(video_id) != 11:
-                return "Error: Invalid YouTube video ID"
             if not expected_genre:
                 return "Error: Expected genre cannot be empty"
-
-            # Download audio
-            try:
-                yt = YouTube(f"https://youtube.com/watch?v={video_id}")
-                audio_stream = yt.streams.filter(only_audio=True).first()
-                if not audio_stream:
-                    return "Error: No audio stream available for this video"
-                audio_path = audio_stream.download(filename="temp_audio")
-            except Exception as youtube_error:
-                return f"YouTube Error: {str(youtube_error)}"
-
-            # Extract features
-            y, sr = librosa.load(audio_path)
-
-            # Calculate basic genre features
-            tempo, _ = librosa.beat.beat_track(y=y)
-            spectral_centroids = librosa.feature.spectral_centroid(y=y)[0]
-            spectral_rolloff = librosa.feature.spectral_rolloff(y=y)[0]
-
-            # Simplified genre matching (example rules)
-            confidence = 0.5  # Base confidence
-
-            if expected_genre.lower() == "rock":
-                if 100 < tempo < 140:
-                    confidence += 0.2
-                if spectral_centroids.mean() > 2000:
-                    confidence += 0.3
-            elif expected_genre.lower() == "classical":
-                if tempo < 100:
-                    confidence += 0.2
-                if spectral_rolloff.mean() < 3000:
-                    confidence += 0.3
-
-            return round(min(confidence, 1.0), 2)
+            # Download on the shared I/O pool, score off the event loop
+            window = select_window(fast, self.analysis_window)
+            audio = await run_blocking(fetch_audio, video_id, pcm_handle, window)
+            if isinstance(audio, str):
+                return audio
+            return await asyncio.to_thread(self._score, audio, expected_genre)
         except Exception as e:
             return f"Error calculating genre confidence: {str(e)}"
+
+    @staticmethod
+    def _score(audio: CachedAudio, expected_genre: str) -> float:
+        # Extract features (single pass, shared with the other tools)
+        descriptors = get_descriptors(audio)
+
+        # Score against the genre prototype
+        features = GenreScorer.feature_matrix([descriptors])
+        confidence = GenreScorer().score(features, [expected_genre])[0, 0]
+
+        return round(float(min(confidence, 1.0)), 2)
+
+
+class BatchAudioAnalysisTool(AsyncToolMixin, BaseTool):
+    name: str = "Batch Audio Analyzer"
+    description: str = (
+        "Analyzes many videos at once in parallel, returning tempo, energy, "
+        "spectral and quality descriptors for each video ID. Prefer this over "
+        "calling the single-video analyzers repeatedly."
+    )
+    args_schema: Type[BaseModel] = BatchAudioAnalysisInput
+    analysis_window: Optional[AnalysisWindow] = None
+
+    def _run(self, video_ids: List[str], fast: bool = False) -> dict:
+        try:
+            # Per-track failures are reported as error strings
+            window = select_window(fast, self.analysis_window)
+            return dict(analyze_batch(video_ids, window=window))
+        except Exception as e:
+            return f"Error running batch audio analysis: {str(e)}"
+
+
+class GenreConfidenceMatrixTool(AsyncToolMixin, BaseTool):
+    name: str = "Genre Confidence Matrix"
+    description: str = (
+        "Scores every given video against every given genre in one call and "
+        "returns the full confidence matrix. Prefer this over calling the "
+        "Genre Confidence Calculator once per track and genre."
+    )
+    args_schema: Type[BaseModel] = GenreConfidenceMatrixInput
+    analysis_window: Optional[AnalysisWindow] = None
+
+    def _run(
+        self, video_ids: List[str], genres: List[str], fast: bool = False
+    ) -> dict:
+        try:
+            if not genres:
+                return "Error: Genres cannot be empty"
+
+            # Analyze every track once, in parallel
+            analyzed, errors = [], {}
+            window = select_window(fast, self.analysis_window)
+            for video_id, result in analyze_batch(video_ids, window=window):
+                if isinstance(result, dict):
+                    analyzed.append((video_id, result))
+                else:
+                    errors[video_id] = result
+
+            # Score the N × G matrix in one operation
+            features = GenreScorer.feature_matrix(result for _, result in analyzed)
+            confidence = GenreScorer().score(features, genres)
+
+            return {
+                "genres": genres,
+                "confidence": {
+                    video_id: {
+                        genre: round(float(score), 2)
+                        for genre, score in zip(genres, row)
+                    }
+                    for (video_id, _), row in zip(analyzed, confidence)
+                },
+                "errors": errors,
+            }
+        except Exception as e:
+            return f"Error calculating genre confidence matrix: {str(e)}"
@@ -4,6 +4,109 @@ from crewai_tools import BaseTool
 from pydantic import BaseModel, Field
 
 
+# Enhanced genre mappings with more subgenres and cross-genre fusions
+GENRE_MAPPINGS = {
+    "rock": [
+        "alternative rock",
+        "indie rock",
+        "classic rock",
+        "hard rock",
+        "progressive rock",
+        "psychedelic rock",
+        "garage rock",
+        "blues rock",
+        "folk rock",
+        "punk rock",
+        "metal",
+    ],
+    "pop": [
+        "pop rock",
+        "synth pop",
+        "indie pop",
+        "dance pop",
+        "electropop",
+        "art pop",
+        "chamber pop",
+        "baroque pop",
+        "dream pop",
+        "k-pop",
+    ],
+    "hip hop": [
+        "rap",
+        "trap",
+        "conscious hip hop",
+        "boom bap",
+        "southern hip hop",
+        "alternative hip hop",
+        "experimental hip hop",
+        "jazz rap",
+        "pop rap",
+        "gangsta rap",
+    ],
+    "electronic": [
+        "house",
+        "techno",
+        "trance",
+        "dubstep",
+        "drum and bass",
+        "ambient",
+        "electronica",
+        "IDM",
+        "synthwave",
+        "industrial",
+    ],
+    "country": [
+        "country pop",
+        "country rock",
+        "country rap",
+        "bluegrass",
+        "americana",
+        "country folk",
+        "country blues",
+        "nashville sound",
+        "outlaw country",
+        "contemporary country",
+    ],
+    "latin": [
+        "latin pop",
+        "latin rock",
+        "latin hip hop",
+        "reggaeton",
+        "salsa",
+        "bachata",
+        "merengue",
+        "latin jazz",
+        "latin trap",
+        "cumbia",
+    ],
+    "jazz": [
+        "jazz fusion",
+        "smooth jazz",
+        "bebop",
+        "jazz rap",
+        "modal jazz",
+        "free jazz",
+        "cool jazz",
+        "hard bop",
+        "swing",
+        "contemporary jazz",
+    ],
+    "classical": [
+        "baroque",
+        "romantic",
+        "modern classical",
+        "contemporary classical",
+        "minimalist",
+        "orchestral",
+        "chamber music",
+        "opera",
+        "neoclassical",
+        "avant-garde classical",
+    ],
+    # ... existing mappings for other genres ...
+}
+
+
 class UserPreferencesInput(BaseModel):
     """Input schema for parsing user music preferences."""
 
@@ -212,117 +315,15 @@ class GenreExpansionTool(BaseTool):
         Expand a genre into related subgenres and alternative names.
         Returns a list of related genres and subgenres.
         """
-        # Enhanced genre mappings with more subgenres and cross-genre fusions
-        genre_mappings = {
-            "rock": [
-                "alternative rock",
-                "indie rock",
-                "classic rock",
-                "hard rock",
-                "progressive rock",
-                "psychedelic rock",
-                "garage rock",
-                "blues rock",
-                "folk rock",
-                "punk rock",
-                "metal",
-            ],
-            "pop": [
-                "pop rock",
-                "synth pop",
-                "indie pop",
-                "dance pop",
-                "electropop",
-                "art pop",
-                "chamber pop",
-                "baroque pop",
-                "dream pop",
-                "k-pop",
-            ],
-            "hip hop": [
-                "rap",
-                "trap",
-                "conscious hip hop",
-                "boom bap",
-                "southern hip hop",
-                "alternative hip hop",
-                "experimental hip hop",
-                "jazz rap",
-                "pop rap",
-                "gangsta rap",
-            ],
-            "electronic": [
-                "house",
-                "techno",
-                "trance",
-                "dubstep",
-                "drum and bass",
-                "ambient",
-                "electronica",
-                "IDM",
-                "synthwave",
-                "industrial",
-            ],
-            "country": [
-                "country pop",
-                "country rock",
-                "country rap",
-                "bluegrass",
-                "americana",
-                "country folk",
-                "country blues",
-                "nashville sound",
-                "outlaw country",
-                "contemporary country",
-            ],
-            "latin": [
-                "latin pop",
-                "latin rock",
-                "latin hip hop",
-                "reggaeton",
-                "salsa",
-                "bachata",
-                "merengue",
-                "latin jazz",
-                "latin trap",
-                "cumbia",
-            ],
-            "jazz": [
-                "jazz fusion",
-                "smooth jazz",
-                "bebop",
-                "jazz rap",
-                "modal jazz",
-                "free jazz",
-                "cool jazz",
-                "hard bop",
-                "swing",
-                "contemporary jazz",
-            ],
-            "classical": [
-                "baroque",
-                "romantic",
-                "modern classical",
-                "contemporary classical",
-                "minimalist",
-                "orchestral",
-                "chamber music",
-                "opera",
-                "neoclassical",
-                "avant-garde classical",
-            ],
-            # ... existing mappings for other genres ...
-        }
-
         # Handle case-insensitive matching
         genre_lower = genre.lower()
 
         # Direct match
-        if genre_lower in genre_mappings:
-            return genre_mappings[genre_lower]
+        if genre_lower in GENRE_MAPPINGS:
+            return GENRE_MAPPINGS[genre_lower]
 
         # Partial match (if genre contains spaces or hyphens)
-        for main_genre, subgenres in genre_mappings.items():
+        for main_genre, subgenres in GENRE_MAPPINGS.items():
             if genre_lower in main_genre or main_genre in genre_lower:
                 return subgenres
             # Check if it's already a subgenre
@@ -0,0 +1,362 @@
+import bisect
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from googleapiclient.errors import HttpError
+
+from src.tools.youtube_service import execute
+
+logger = logging.getLogger(__name__)
+
+# More workers overlap more inserts, and every item that lands out of order
+# costs an extra update (50 quota units) to move back
+DEFAULT_WORKERS = 4
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 16.0
+
+# HTTP statuses worth retrying; 409 is returned when concurrent writes to the
+# same playlist conflict
+TRANSIENT_STATUSES = {409, 429, 500, 502, 503, 504}
+TRANSIENT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError"}
+# Statuses after which a write may have been applied even though it failed;
+# an insert is only retried once the playlist shows it did not land
+AMBIGUOUS_STATUSES = {500, 502, 503, 504}
+
+
+@dataclass
+class InsertOutcome:
+    """Result of adding one video to a playlist."""
+
+    video_id: str
+    status: str = "pending"
+    playlist_item_id: Optional[str] = None
+    attempts: int = 0
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def is_transient(error: Exception) -> bool:
+    """Returns True for API errors that are worth retrying."""
+    if not isinstance(error, HttpError):
+        return isinstance(error, (ConnectionError, TimeoutError))
+    if error.resp.status in TRANSIENT_STATUSES:
+        return True
+    return _reason(error) in TRANSIENT_REASONS
+
+
+def may_have_landed(error: Exception) -> bool:
+    """Returns True for failures that do not rule out the write being applied."""
+    if not isinstance(error, HttpError):
+        return isinstance(error, (ConnectionError, TimeoutError))
+    return error.resp.status in AMBIGUOUS_STATUSES or _reason(error) == "backendError"
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given attempt (from 1)."""
+    ceiling = min(BACKOFF_BASE_SECONDS * 2 ** (attempt - 1), BACKOFF_MAX_SECONDS)
+    return random.uniform(0, ceiling)
+
+
+class PlaylistBulkInserter:
+    """
+    Adds many videos to a playlist concurrently, keeping the input order.
+
+    Inserts run on a bounded worker pool and append to the playlist, sent in
+    input order. An item only lands out of order when its request overtakes
+    an earlier one or is retried, so the playlist is read back afterwards
+    and the fewest items needed are moved back into order.
+
+    An insert that fails with a server error may still have been applied, so
+    before retrying it the playlist is checked for a new item of that video.
+    """
+
+    def __init__(
+        self,
+        youtube,
+        max_workers: int = DEFAULT_WORKERS,
+        max_attempts: int = MAX_ATTEMPTS,
+    ):
+        self.youtube = youtube
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+
+    def insert(
+        self,
+        playlist_id: str,
+        video_ids: List[str],
+        existing: Optional[Dict[int, str]] = None,
+        on_added: Optional[Callable[[int, InsertOutcome], None]] = None,
+    ) -> dict:
+        """
+        Inserts ``video_ids`` and returns per-video outcomes.
+
+        ``existing`` maps input indices already in the playlist to their
+        playlist item IDs; those are not inserted again but still count for
+        the final order. ``on_added`` is called after each successful insert.
+        """
+        existing = existing or {}
+        outcomes = [InsertOutcome(video_id) for video_id in video_ids]
+        # Items already there, so a failed insert is not credited with them
+        has_items = self._playlist_length(playlist_id) > 0
+        known = self.playlist_items(playlist_id) if has_items else []
+        ledger = _ItemLedger(item_id for item_id, _ in known)
+        for index, item_id in existing.items():
+            outcomes[index].status = "existing"
+            outcomes[index].playlist_item_id = item_id
+
+        def run(index: int) -> None:
+            self._insert_one(playlist_id, outcomes[index], ledger)
+            if on_added and outcomes[index].status == "added":
+                on_added(index, outcomes[index])
+
+        pending = [i for i in range(len(video_ids)) if i not in existing]
+        logger.info("Adding %d videos to playlist %s", len(pending), playlist_id)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(run, pending))
+
+        placed = [o for o in outcomes if o.status in ("added", "existing")]
+        moved = self._repair_order(playlist_id, placed) if len(placed) > 1 else 0
+
+        added = sum(outcome.status == "added" for outcome in outcomes)
+        return {
+            "added": added,
+            "existing": len(existing),
+            "failed": len(outcomes) - added - len(existing),
+            "reordered": moved,
+            "results": [outcome.to_dict() for outcome in outcomes],
+        }
+
+    def playlist_items(self, playlist_id: str) -> List[Tuple[str, str]]:
+        """Returns ``(playlist item ID, video ID)`` for every item, in order."""
+        items, page_token = [], None
+        while True:
+            response = self._execute(
+                self.youtube.playlistItems().list(
+                    part="snippet",
+                    playlistId=playlist_id,
+                    maxResults=50,
+                    pageToken=page_token,
+                    fields="items(id,snippet/resourceId/videoId),nextPageToken",
+                )
+            )
+            items.extend(
+                (item["id"], item["snippet"]["resourceId"]["videoId"])
+                for item in response.get("items", [])
+            )
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return items
+
+    def _insert_one(self, playlist_id, outcome, ledger) -> None:
+        while outcome.attempts < self.max_attempts:
+            outcome.attempts += 1
+            snippet = {
+                "playlistId": playlist_id,
+                "resourceId": {"kind": "youtube#video", "videoId": outcome.video_id},
+            }
+            ledger.sending(outcome.video_id)
+            try:
+                response = execute(
+                    self.youtube.playlistItems().insert(
+                        part="snippet", body={"snippet": snippet}
+                    )
+                )
+                item_id = response["id"]
+                ledger.done(outcome.video_id, item_id)
+            except Exception as e:
+                ledger.done(outcome.video_id)
+                outcome.error = str(e)
+                try:
+                    item_id = self._find_landed(playlist_id, outcome, ledger, e)
+                except Exception as check_error:
+                    # Retrying without knowing could add the video twice
+                    outcome.error = f"{e} (not retried: {check_error})"
+                    break
+                if not item_id:
+                    if not is_transient(e) or outcome.attempts >= self.max_attempts:
+                        break
+                    delay = backoff_delay(outcome.attempts)
+                    logger.warning(
+                        "Retrying video %s in %.1fs: %s", outcome.video_id, delay, e
+                    )
+                    time.sleep(delay)
+                    continue
+                logger.info("Video %s was added despite: %s", outcome.video_id, e)
+
+            outcome.status = "added"
+            outcome.playlist_item_id = item_id
+            outcome.error = None
+            logger.debug("Added video %s", outcome.video_id)
+            return
+
+        outcome.status = "failed"
+        logger.error("Failed to add video %s: %s", outcome.video_id, outcome.error)
+
+    def _find_landed(self, playlist_id, outcome, ledger, error) -> Optional[str]:
+        """Item ID of a failed insert that was applied anyway, else None."""
+        if not may_have_landed(error):
+            return None
+        for attempt in range(1, self.max_attempts + 1):
+            # A new item can only be attributed while no other insert of the
+            # same video is in flight
+            if not ledger.in_flight(outcome.video_id):
+                return ledger.adopt(outcome.video_id, self.playlist_items(playlist_id))
+            time.sleep(backoff_delay(attempt))
+        raise RuntimeError("other inserts of the video are still in flight")
+
+    def _playlist_length(self, playlist_id: str) -> int:
+        response = self._execute(
+            self.youtube.playlistItems().list(
+                part="id", playlistId=playlist_id, maxResults=1
+            )
+        )
+        return response.get("pageInfo", {}).get("totalResults", 0)
+
+    def _playlist_item_ids(self, playlist_id: str) -> List[str]:
+        item_ids, page_token = [], None
+        while True:
+            response = self._execute(
+                self.youtube.playlistItems().list(
+                    part="id",
+                    playlistId=playlist_id,
+                    maxResults=50,
+                    pageToken=page_token,
+                )
+            )
+            item_ids.extend(item["id"] for item in response.get("items", []))
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return item_ids
+
+    def _repair_order(self, playlist_id: str, placed: List[InsertOutcome]) -> int:
+        """Moves inserted items so they follow the input order; returns moves."""
+        try:
+            items = self._playlist_item_ids(playlist_id)
+        except Exception as e:
+            logger.warning("Could not verify order of playlist %s: %s", playlist_id, e)
+            return 0
+
+        positions: Dict[str, int] = {item_id: i for i, item_id in enumerate(items)}
+        expected = [o for o in placed if o.playlist_item_id in positions]
+        if len(expected) < 2:
+            return 0
+
+        # Items on the longest run already in input order stay where they are;
+        # each of the others is moved right after its predecessor
+        in_order = _longest_increasing(
+            [positions[o.playlist_item_id] for o in expected]
+        )
+        moves = 0
+        for i, outcome in enumerate(expected):
+            if i in in_order:
+                continue
+            current = items.index(outcome.playlist_item_id)
+            if i > 0:
+                target = items.index(expected[i - 1].playlist_item_id) + 1
+            else:
+                target = items.index(expected[min(in_order)].playlist_item_id)
+            if target > current:
+                target -= 1
+            if target == current:
+                continue
+            self._execute(
+                self.youtube.playlistItems().update(
+                    part="snippet",
+                    body={
+                        "id": outcome.playlist_item_id,
+                        "snippet": {
+                            "playlistId": playlist_id,
+                            "resourceId": {
+                                "kind": "youtube#video",
+                                "videoId": outcome.video_id,
+                            },
+                            "position": target,
+                        },
+                    },
+                )
+            )
+            items.insert(target, items.pop(current))
+            moves += 1
+
+        if moves:
+            logger.info("Moved %d items in playlist %s into order", moves, playlist_id)
+        return moves
+
+    def _execute(self, request):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return execute(request)
+            except Exception as e:
+                if not is_transient(e) or attempt == self.max_attempts:
+                    raise
+                time.sleep(backoff_delay(attempt))
+
+
+def _reason(error: HttpError) -> Optional[str]:
+    try:
+        return error.error_details[0].get("reason")
+    except (AttributeError, IndexError, TypeError):
+        return None
+
+
+class _ItemLedger:
+    """Playlist items accounted for, to attribute items of failed inserts."""
+
+    def __init__(self, known):
+        self.known: Set[str] = set(known)
+        self._sending: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def sending(self, video_id: str) -> None:
+        with self._lock:
+            self._sending[video_id] = self._sending.get(video_id, 0) + 1
+
+    def done(self, video_id: str, item_id: Optional[str] = None) -> None:
+        with self._lock:
+            self._sending[video_id] -= 1
+            if item_id:
+                self.known.add(item_id)
+
+    def in_flight(self, video_id: str) -> bool:
+        with self._lock:
+            return self._sending.get(video_id, 0) > 0
+
+    def adopt(self, video_id: str, items: List[Tuple[str, str]]) -> Optional[str]:
+        """Claims an item of ``video_id`` that no insert accounts for yet."""
+        with self._lock:
+            for item_id, item_video_id in items:
+                if item_video_id == video_id and item_id not in self.known:
+                    self.known.add(item_id)
+                    return item_id
+        return None
+
+
+def _longest_increasing(values: List[int]) -> Set[int]:
+    """Indices of one longest strictly increasing subsequence of ``values``."""
+    tails: List[int] = []
+    tail_values: List[int] = []
+    previous = [-1] * len(values)
+    for i, value in enumerate(values):
+        j = bisect.bisect_left(tail_values, value)
+        if j > 0:
+            previous[i] = tails[j - 1]
+        if j == len(tails):
+            tails.append(i)
+            tail_values.append(value)
+        else:
+            tails[j] = i
+            tail_values[j] = value
+
+    indices, i = set(), tails[-1] if tails else -1
+    while i >= 0:
+        indices.add(i)
+        i = previous[i]
+    return indices
@@ -0,0 +1,194 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.tools.track_table import TrackTable
+
+# Energy bounds of the mood buckets; medium includes both bounds
+HIGH_ENERGY = 0.7
+LOW_ENERGY = 0.3
+
+
+class PlaylistSummaryAccumulator:
+    """
+    Single-pass, mergeable playlist summary.
+
+    ``add`` folds one track into running counts and totals, so tracks can
+    come from any iterator and the full list is never held in memory.
+    Accumulators built over separate chunks (e.g. in worker processes) are
+    combined with ``merge``; ``result`` returns the same dict as
+    ``PlaylistSummaryTool``.
+    """
+
+    def __init__(self):
+        self.total_tracks = 0
+        self.total_seconds = 0
+        self.genres: Counter = Counter()
+        self.bpm_count = 0
+        self.bpm_total = 0
+        self.bpm_min: Optional[float] = None
+        self.bpm_max: Optional[float] = None
+        self.eras: Counter = Counter()
+        self.languages: Counter = Counter()
+        self.total_energy = 0
+        self.high_energy = 0
+        self.medium_energy = 0
+        self.low_energy = 0
+
+    def add(self, track: dict) -> "PlaylistSummaryAccumulator":
+        """Folds one track into the summary."""
+        self.total_tracks += 1
+        self.total_seconds += track.get("duration_seconds", 0)
+        self.genres.update(track.get("genres", ["Unknown"]))
+
+        bpm = track.get("bpm", 0)
+        if bpm > 0:
+            self.bpm_count += 1
+            self.bpm_total += bpm
+            self.bpm_min = bpm if self.bpm_min is None else min(self.bpm_min, bpm)
+            self.bpm_max = bpm if self.bpm_max is None else max(self.bpm_max, bpm)
+
+        year = track.get("year", "Unknown")
+        self.eras[f"{str(year)[:3]}0s" if isinstance(year, int) else "Unknown"] += 1
+        self.languages[track.get("language", "Unknown")] += 1
+
+        energy = track.get("energy", 0)
+        self.total_energy += energy
+        if energy > HIGH_ENERGY:
+            self.high_energy += 1
+        elif energy >= LOW_ENERGY:
+            self.medium_energy += 1
+        elif energy < LOW_ENERGY:
+            self.low_energy += 1
+        return self
+
+    def extend(self, tracks: Iterable[dict]) -> "PlaylistSummaryAccumulator":
+        """Folds every track of an iterable into the summary."""
+        for track in tracks:
+            self.add(track)
+        return self
+
+    def add_table(self, table: TrackTable) -> "PlaylistSummaryAccumulator":
+        """
+        Folds a whole ``TrackTable`` into the summary with column operations.
+
+        Counts match adding its tracks one by one; float totals may differ
+        in the last bits because NumPy sums in a different order.
+        """
+        count = len(table)
+        self.total_tracks += count
+        self.total_seconds += table.column("duration_seconds").sum().item()
+
+        # Tracks without genres count once as "Unknown", in track order
+        unknown = len(table.genre_vocab)
+        lengths = np.where(table.has_genres, np.diff(table.genre_offsets), 1)
+        starts = np.concatenate(([0], np.cumsum(lengths)))[:-1]
+        genres = np.full(lengths.sum(), unknown)
+        rows = table.genre_rows()
+        positions = starts[rows] + np.arange(len(rows)) - table.genre_offsets[rows]
+        genres[positions] = table.genre_codes
+        self.genres.update(_ordered_counts(genres, table.genre_vocab + ["Unknown"]))
+
+        bpms = table.numeric["bpm"][table.present["bpm"]]
+        bpms = bpms[bpms > 0]
+        if len(bpms):
+            low, high = bpms.min().item(), bpms.max().item()
+            self.bpm_count += len(bpms)
+            self.bpm_total += bpms.sum().item()
+            self.bpm_min = low if self.bpm_min is None else min(self.bpm_min, low)
+            self.bpm_max = high if self.bpm_max is None else max(self.bpm_max, high)
+
+        years = table.numeric["year"]
+        distinct = np.unique(years[table.present["year"]])
+        labels = [f"{str(year)[:3]}0s" for year in distinct.tolist()] + ["Unknown"]
+        eras = np.where(
+            table.present["year"], np.searchsorted(distinct, years), len(distinct)
+        )
+        self.eras.update(_ordered_counts(eras, labels))
+
+        languages = table.codes["language"]
+        vocab = table.vocab["language"]
+        languages = np.where(languages >= 0, languages, len(vocab))
+        self.languages.update(_ordered_counts(languages, vocab + ["Unknown"]))
+
+        energy = table.column("energy")
+        self.total_energy += energy.sum().item()
+        self.high_energy += int((energy > HIGH_ENERGY).sum())
+        self.medium_energy += int(
+            ((energy >= LOW_ENERGY) & (energy <= HIGH_ENERGY)).sum()
+        )
+        self.low_energy += int((energy < LOW_ENERGY).sum())
+        return self
+
+    def merge(
+        self, other: "PlaylistSummaryAccumulator"
+    ) -> "PlaylistSummaryAccumulator":
+        """Adds the tracks summarized by ``other``, as if they came after ours."""
+        self.total_tracks += other.total_tracks
+        self.total_seconds += other.total_seconds
+        self.genres.update(other.genres)
+        self.bpm_count += other.bpm_count
+        self.bpm_total += other.bpm_total
+        if other.bpm_count:
+            self.bpm_min = (
+                other.bpm_min
+                if self.bpm_min is None
+                else min(self.bpm_min, other.bpm_min)
+            )
+            self.bpm_max = (
+                other.bpm_max
+                if self.bpm_max is None
+                else max(self.bpm_max, other.bpm_max)
+            )
+        self.eras.update(other.eras)
+        self.languages.update(other.languages)
+        self.total_energy += other.total_energy
+        self.high_energy += other.high_energy
+        self.medium_energy += other.medium_energy
+        self.low_energy += other.low_energy
+        return self
+
+    def result(self) -> dict:
+        """Returns the summary of every track added so far."""
+        hours = self.total_seconds // 3600
+        minutes = (self.total_seconds % 3600) // 60
+
+        if self.bpm_count:
+            tempo = {
+                "min_bpm": self.bpm_min,
+                "max_bpm": self.bpm_max,
+                "avg_bpm": self.bpm_total / self.bpm_count,
+            }
+        else:
+            tempo = {"min_bpm": 0, "max_bpm": 0, "avg_bpm": 0}
+
+        return {
+            "total_tracks": self.total_tracks,
+            "total_duration": f"{hours}h {minutes}m",
+            "genre_distribution": {
+                genre: (count / self.total_tracks) * 100
+                for genre, count in self.genres.items()
+            },
+            "tempo_analysis": tempo,
+            "era_distribution": dict(self.eras),
+            "language_breakdown": dict(self.languages),
+            "mood_analysis": {
+                "high_energy": self.high_energy,
+                "medium_energy": self.medium_energy,
+                "low_energy": self.low_energy,
+                "average_energy": (
+                    self.total_energy / self.total_tracks if self.total_tracks else 0
+                ),
+            },
+        }
+
+
+def _ordered_counts(codes: np.ndarray, labels: List[str]) -> Dict[str, int]:
+    # Counts per label, in order of first appearance like a running Counter
+    values, first, counts = np.unique(codes, return_index=True, return_counts=True)
+    result: Dict[str, int] = {}
+    for i in np.argsort(first, kind="stable").tolist():
+        label = labels[values[i]]
+        result[label] = result.get(label, 0) + int(counts[i])
+    return result
@@ -1,8 +1,24 @@
-from typing import List, Type
+import os
+from typing import List, Literal, Optional, Type, Union
 
+import numpy as np
 from crewai_tools import BaseTool
 from pydantic import BaseModel, Field
 
+from src.tools.async_runtime import AsyncToolMixin
+from src.tools.metadata_cache import fetch_videos
+from src.tools.playlist_summary import PlaylistSummaryAccumulator
+from src.tools.region_index import RegionIndex, get_region_index
+from src.tools.sequencing import (
+    DEFAULT_TIME_BUDGET,
+    optimize_sequence,
+    order_score,
+    pair_scores,
+    transition_matrices,
+)
+from src.tools.track_table import TrackTable
+from src.tools.youtube_service import get_youtube_service
+
 
 class TransitionAnalysisInput(BaseModel):
     """Input schema for transition analysis."""
@@ -10,6 +26,11 @@ class TransitionAnalysisInput(BaseModel):
     track_list: List[dict] = Field(
         ..., description="List of tracks to analyze for transitions compatibility"
     )
+    optimize_order: bool = Field(
+        False,
+        description="Reorder the tracks for the smoothest transitions before "
+        "analyzing them",
+    )
 
 
 class RegionalAvailabilityInput(BaseModel):
@@ -18,8 +39,18 @@ class RegionalAvailabilityInput(BaseModel):
     video_ids: List[str] = Field(
         ..., description="List of video IDs to check for regional availability"
     )
-    region_code: str = Field(
-        ..., description="Region code to check availability against"
+    region_code: Optional[str] = Field(
+        None, description="Region code to check availability against"
+    )
+    region_codes: Optional[List[str]] = Field(
+        None,
+        description="Several region codes to check at once, e.g. "
+        '["ES", "MX", "US"]; used instead of region_code',
+    )
+    mode: Literal["all", "any"] = Field(
+        "all",
+        description="With region_codes, whether videos must be playable in all "
+        "of the regions or in any of them",
     )
 
 
@@ -35,74 +66,56 @@ class TransitionAnalysisTool(BaseTool):
     name: str = "Transition Analyzer"
     description: str = (
         "Analyzes adjacent tracks in a playlist for compatibility based on "
-        "key compatibility, BPM matching, and energy level transitions."
+        "key compatibility, BPM matching, and energy level transitions. "
+        "With optimize_order it also finds the smoothest order of the tracks."
     )
     args_schema: Type[BaseModel] = TransitionAnalysisInput
+    time_budget: float = DEFAULT_TIME_BUDGET
 
-    def _run(self, track_list: List[dict]) -> List[dict]:
+    def _run(
+        self, track_list: List[dict], optimize_order: bool = False
+    ) -> Union[List[dict], dict]:
         """Analyze transitions between adjacent tracks."""
-        transitions = []
-
-        for i in range(len(track_list) - 1):
-            current_track = track_list[i]
-            next_track = track_list[i + 1]
-
-            # Calculate compatibility scores
-            key_score = self._calculate_key_compatibility(
-                current_track.get("key", ""), next_track.get("key", "")
-            )
-
-            bpm_score = self._calculate_bpm_compatibility(
-                current_track.get("bpm", 0), next_track.get("bpm", 0)
-            )
-
-            energy_score = self._calculate_energy_transition(
-                current_track.get("energy", 0), next_track.get("energy", 0)
-            )
-
-            transitions.append(
-                {
-                    "track_pair": [current_track["title"], next_track["title"]],
-                    "key_compatibility": key_score,
-                    "bpm_compatibility": bpm_score,
-                    "energy_transition": energy_score,
-                    "overall_score": (key_score + bpm_score + energy_score) / 3,
-                    "suggestions": self._generate_transition_suggestions(
-                        key_score, bpm_score, energy_score
-                    ),
-                }
-            )
-
-        return transitions
-
-    def _calculate_key_compatibility(self, key1: str, key2: str) -> float:
-        # Camelot wheel compatibility scoring
-        # Simplified version - could be expanded with full Camelot wheel logic
-        if not key1 or not key2:
-            return 0.5  # Neutral score if keys are unknown
-
-        return 1.0 if key1 == key2 else 0.7  # Perfect match or adjacent keys
-
-    def _calculate_bpm_compatibility(self, bpm1: float, bpm2: float) -> float:
-        if not bpm1 or not bpm2:
-            return 0.5  # Neutral score if BPM unknown
-
-        bpm_diff = abs(bpm1 - bpm2)
-        if bpm_diff <= 5:
-            return 1.0
-        elif bpm_diff <= 10:
-            return 0.8
-        elif bpm_diff <= 20:
-            return 0.6
-        else:
-            return 0.4
-
-    def _calculate_energy_transition(self, energy1: float, energy2: float) -> float:
-        if not energy1 or not energy2:
-            return 0.5  # Neutral score if energy levels unknown
-
-        energy_diff = abs(energy1 - energy2)
-        return 1.0 - (energy_diff / 2)  # Smooth transitions preferred
+        table = TrackTable.of(track_list)
+        if optimize_order:
+            return self._optimize(table)
+        return self._transitions(table)
+
+    def _transitions(self, table: TrackTable) -> List[dict]:
+        # Scores of every adjacent pair, computed column-wise
+        rows = np.arange(len(table))
+        scores = pair_scores(table, rows[:-1], rows[1:])
+        key, bpm, energy, overall = (
+            scores[name].tolist() for name in ("key", "bpm", "energy", "overall")
+        )
+        titles = table.titles.tolist()
+
+        return [
+            {
+                "track_pair": [titles[i], titles[i + 1]],
+                "key_compatibility": key[i],
+                "bpm_compatibility": bpm[i],
+                "energy_transition": energy[i],
+                "overall_score": overall[i],
+                "suggestions": self._generate_transition_suggestions(
+                    key[i], bpm[i], energy[i]
+                ),
+            }
+            for i in range(len(table) - 1)
+        ]
+
+    def _optimize(self, table: TrackTable) -> dict:
+        """Finds a smooth order and analyzes the transitions along it."""
+        overall = transition_matrices(table)["overall"]
+        order, score = optimize_sequence(overall, self.time_budget)
+        ordered = table.take(order)
+        return {
+            "order": order,
+            "track_order": ordered.titles.tolist(),
+            "overall_score": score,
+            "original_score": order_score(overall, range(len(table))),
+            "transitions": self._transitions(ordered),
+        }
 
     def _generate_transition_suggestions(
         self, key_score: float, bpm_score: float, energy_score: float
@@ -123,55 +136,90 @@ class TransitionAnalysisTool(BaseTool):
         return suggestions if suggestions else ["Good transition"]
 
 
-class RegionalAvailabilityTool(BaseTool):
+class RegionalAvailabilityTool(AsyncToolMixin, BaseTool):
     name: str = "Regional Availability Checker"
     description: str = (
         "Verifies if videos in a playlist are available in the user's region "
-        "to prevent regional licensing issues."
+        "to prevent regional licensing issues. Several regions can be checked "
+        "at once with region_codes."
     )
     args_schema: Type[BaseModel] = RegionalAvailabilityInput
 
-    def _run(self, video_ids: List[str], region_code: str) -> dict:
+    def _run(
+        self,
+        video_ids: List[str],
+        region_code: Optional[str] = None,
+        region_codes: Optional[List[str]] = None,
+        mode: str = "all",
+    ) -> dict:
         """Check regional availability of videos."""
-        import os
-
-        from googleapiclient.discovery import build
-
-        youtube = build("youtube", "v3", developerKey=os.getenv("YOUTUBE_API_KEY"))
-        results = {"available": [], "unavailable": [], "restricted": []}
-
         try:
-            # Check videos in batches of 50 (API limit)
-            for i in range(0, len(video_ids), 50):
-                batch = video_ids[i : i + 50]
-                response = (
-                    youtube.videos()
-                    .list(part="contentDetails,status", id=",".join(batch))
-                    .execute()
-                )
-
-                for video in response["items"]:
-                    video_id = video["id"]
-
-                    # Check if video is blocked in the region
-                    region_restriction = video["contentDetails"].get(
-                        "regionRestriction", {}
+            index = get_region_index()
+            missing = index.missing(video_ids)
+            if missing:
+                # Cached videos are reused; the rest are fetched in batches of 50.
+                # Region data is public, so it is read with the API key rather
+                # than against the user's OAuth quota
+                api_key = os.getenv("YOUTUBE_API_KEY")
+                if not api_key:
+                    raise ValueError(
+                        "YOUTUBE_API_KEY must be set to look up region restrictions"
                     )
-                    allowed = region_restriction.get("allowed", [])
-                    blocked = region_restriction.get("blocked", [])
-
-                    if blocked and region_code in blocked:
-                        results["unavailable"].append(video_id)
-                    elif allowed and region_code not in allowed:
-                        results["restricted"].append(video_id)
-                    else:
-                        results["available"].append(video_id)
-
+                youtube = get_youtube_service(api_key=api_key)
+                index.update(fetch_videos(youtube, missing, ["contentDetails"]))
+
+            # Videos the API did not return are left out
+            video_ids = list(dict.fromkeys(video_ids))
+            rows = index.rows(video_ids)
+            video_ids = [v for v, row in zip(video_ids, rows) if row >= 0]
+            rows = rows[rows >= 0]
+
+            if region_codes:
+                return self._check_regions(index, video_ids, rows, region_codes, mode)
+            if not region_code:
+                raise ValueError("Either region_code or region_codes is required")
+
+            playable = index.playable_in(rows, [region_code])
+            blocked = index.blocked_in(rows, region_code)
         except Exception as e:
             raise Exception(f"Failed to check regional availability: {str(e)}")
 
+        results = {"available": [], "unavailable": [], "restricted": []}
+        for video_id, is_playable, is_blocked in zip(video_ids, playable, blocked):
+            if is_blocked:
+                results["unavailable"].append(video_id)
+            elif not is_playable:
+                results["restricted"].append(video_id)
+            else:
+                results["available"].append(video_id)
         return results
 
+    @staticmethod
+    def _check_regions(
+        index: RegionIndex,
+        video_ids: List[str],
+        rows: np.ndarray,
+        region_codes: List[str],
+        mode: str,
+    ) -> dict:
+        available = index.playable_in(rows, region_codes, mode)
+        # Videos × regions; one bitwise test per region
+        per_region = np.column_stack(
+            [index.playable_in(rows, [code]) for code in region_codes]
+        )
+        return {
+            "mode": mode,
+            "region_codes": region_codes,
+            "available": [v for v, ok in zip(video_ids, available) if ok],
+            "unavailable": [v for v, ok in zip(video_ids, available) if not ok],
+            # Where each partly unplayable video cannot be played
+            "unplayable_regions": {
+                video_id: [c for c, ok in zip(region_codes, playable) if not ok]
+                for video_id, playable in zip(video_ids, per_region)
+                if not playable.all()
+            },
+        }
+
 
 class PlaylistSummaryTool(BaseTool):
     name: str = "Playlist Summarizer"
@@ -183,75 +231,5 @@ class PlaylistSummaryTool(BaseTool):
 
     def _run(self, playlist_data: dict) -> dict:
         """Generate comprehensive playlist summary."""
-        tracks = playlist_data.get("tracks", [])
-
-        summary = {
-            "total_tracks": len(tracks),
-            "total_duration": self._calculate_total_duration(tracks),
-            "genre_distribution": self._analyze_genre_distribution(tracks),
-            "tempo_analysis": self._analyze_tempo(tracks),
-            "era_distribution": self._analyze_eras(tracks),
-            "language_breakdown": self._analyze_languages(tracks),
-            "mood_analysis": self._analyze_mood(tracks),
-        }
-
-        return summary
-
-    def _calculate_total_duration(self, tracks: List[dict]) -> str:
-        total_seconds = sum(track.get("duration_seconds", 0) for track in tracks)
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        return f"{hours}h {minutes}m"
-
-    def _analyze_genre_distribution(self, tracks: List[dict]) -> dict:
-        genres = {}
-        for track in tracks:
-            for genre in track.get("genres", ["Unknown"]):
-                genres[genre] = genres.get(genre, 0) + 1
-
-        # Convert to percentages
-        total = len(tracks)
-        return {genre: (count / total) * 100 for genre, count in genres.items()}
-
-    def _analyze_tempo(self, tracks: List[dict]) -> dict:
-        bpms = [track.get("bpm", 0) for track in tracks if track.get("bpm", 0) > 0]
-        if not bpms:
-            return {"min_bpm": 0, "max_bpm": 0, "avg_bpm": 0}
-
-        return {
-            "min_bpm": min(bpms),
-            "max_bpm": max(bpms),
-            "avg_bpm": sum(bpms) / len(bpms),
-        }
-
-    def _analyze_eras(self, tracks: List[dict]) -> dict:
-        eras = {}
-        for track in tracks:
-            year = track.get("year", "Unknown")
-            decade = f"{str(year)[:3]}0s" if isinstance(year, int) else "Unknown"
-            eras[decade] = eras.get(decade, 0) + 1
-
-        return eras
-
-    def _analyze_languages(self, tracks: List[dict]) -> dict:
-        languages = {}
-        for track in tracks:
-            lang = track.get("language", "Unknown")
-            languages[lang] = languages.get(lang, 0) + 1
-
-        return languages
-
-    def _analyze_mood(self, tracks: List[dict]) -> dict:
-        total_energy = sum(track.get("energy", 0) for track in tracks)
-        avg_energy = total_energy / len(tracks) if tracks else 0
-
-        moods = {
-            "high_energy": len([t for t in tracks if t.get("energy", 0) > 0.7]),
-            "medium_energy": len(
-                [t for t in tracks if 0.3 <= t.get("energy", 0) <= 0.7]
-            ),
-            "low_energy": len([t for t in tracks if t.get("energy", 0) < 0.3]),
-            "average_energy": avg_energy,
-        }
-
-        return moods
+        table = TrackTable.of(playlist_data.get("tracks", []))
+        return PlaylistSummaryAccumulator().add_table(table).result()
@@ -0,0 +1,218 @@
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import closing
+from datetime import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+DEFAULT_USAGE_PATH = os.getenv(
+    "PLAI_QUOTA_USAGE_PATH", os.path.join(".plai_cache", "quota.sqlite3")
+)
+DEFAULT_DAILY_BUDGET = int(os.getenv("PLAI_YOUTUBE_DAILY_QUOTA", "10000"))
+DEFAULT_UNITS_PER_SECOND = float(os.getenv("PLAI_YOUTUBE_UNITS_PER_SECOND", "200"))
+DEFAULT_BURST_UNITS = 500
+# Share of the daily budget only playlist writes may spend
+DEFAULT_WRITE_RESERVE = 0.2
+
+# Data API quota resets at midnight Pacific time
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+# Unit cost per API method; anything else costs by its verb
+METHOD_COSTS = {"youtube.search.list": 100}
+VERB_COSTS = {"list": 1, "insert": 50, "update": 50, "delete": 50}
+
+# Lower values are served first
+PRIORITY_WRITE = 0
+PRIORITY_READ = 1
+PRIORITY_SEARCH = 2
+
+
+class QuotaExhausted(Exception):
+    """Raised when a request would exceed the daily quota budget."""
+
+
+def request_cost(method_id: str) -> int:
+    """Quota units charged for an API method such as ``youtube.search.list``."""
+    if method_id in METHOD_COSTS:
+        return METHOD_COSTS[method_id]
+    return VERB_COSTS.get(method_id.rsplit(".", 1)[-1], 50)
+
+
+def request_priority(method_id: str) -> int:
+    """Scheduling priority: writes first, then lookups, then searches."""
+    if method_id == "youtube.search.list":
+        return PRIORITY_SEARCH
+    if method_id.endswith(".list"):
+        return PRIORITY_READ
+    return PRIORITY_WRITE
+
+
+class QuotaScheduler:
+    """
+    Admits YouTube API requests according to their quota cost.
+
+    A token bucket refilled at ``units_per_second`` smooths bursts, and a
+    daily budget shared by every process using the same usage file caps
+    total spend. Waiting requests are served by priority, so playlist writes
+    go ahead of searches. Once less than ``write_reserve`` of the budget is
+    left, only writes are admitted; other requests fail fast with
+    ``QuotaExhausted`` instead of the API failing midway through a run.
+    """
+
+    def __init__(
+        self,
+        daily_budget: int = DEFAULT_DAILY_BUDGET,
+        units_per_second: float = DEFAULT_UNITS_PER_SECOND,
+        burst_units: int = DEFAULT_BURST_UNITS,
+        write_reserve: float = DEFAULT_WRITE_RESERVE,
+        usage_path: str = DEFAULT_USAGE_PATH,
+    ):
+        self.daily_budget = daily_budget
+        self.units_per_second = units_per_second
+        self.burst_units = max(burst_units, max(METHOD_COSTS.values()))
+        self.write_reserve = write_reserve
+        self.usage_path = usage_path
+
+        self._condition = threading.Condition()
+        self._tokens = float(self.burst_units)
+        self._refilled_at = time.monotonic()
+        self._waiting = []
+        self._sequence = itertools.count()
+
+        self.units_by_method: Counter = Counter()
+        self.requests = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+
+        os.makedirs(os.path.dirname(usage_path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS quota_usage ("
+                " day TEXT PRIMARY KEY, units INTEGER NOT NULL)"
+            )
+
+    def acquire(self, method_id: str, timeout: Optional[float] = None) -> None:
+        """
+        Blocks until a request for ``method_id`` may be sent and charges it.
+
+        Raises ``QuotaExhausted`` if the daily budget does not allow the
+        request, or ``TimeoutError`` if it is not admitted within ``timeout``.
+        """
+        cost = request_cost(method_id)
+        priority = request_priority(method_id)
+        self._reserve_daily(method_id, cost, priority)
+
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        ticket = (priority, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiting[0] == ticket and self._tokens >= cost:
+                        break
+                    delay = max((cost - self._tokens) / self.units_per_second, 0.01)
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError(f"Quota wait timed out for {method_id}")
+                        delay = min(delay, remaining)
+                    self._condition.wait(delay)
+                self._tokens -= cost
+            except BaseException:
+                self._refund_daily(cost)
+                raise
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+
+            self.requests += 1
+            self.units_by_method[method_id] += cost
+            self.wait_seconds += time.monotonic() - start
+
+    def remaining(self) -> int:
+        """Units left in today's budget."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT units FROM quota_usage WHERE day = ?", (self._today(),)
+            ).fetchone()
+        return self.daily_budget - (row[0] if row else 0)
+
+    def metrics(self) -> dict:
+        """Returns today's usage and this process's scheduling counters."""
+        remaining = self.remaining()
+        with self._condition:
+            return {
+                "day": self._today(),
+                "daily_budget": self.daily_budget,
+                "used": self.daily_budget - remaining,
+                "remaining": remaining,
+                "write_only": remaining < self.daily_budget * self.write_reserve,
+                "requests": self.requests,
+                "rejected": self.rejected,
+                "waiting": len(self._waiting),
+                "wait_seconds": round(self.wait_seconds, 3),
+                "units_by_method": dict(self.units_by_method),
+            }
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst_units,
+            self._tokens + (now - self._refilled_at) * self.units_per_second,
+        )
+        self._refilled_at = now
+
+    def _reserve_daily(self, method_id: str, cost: int, priority: int) -> None:
+        # Writes may spend the whole budget; everything else stops at the reserve
+        floor = 0 if priority == PRIORITY_WRITE else self.write_reserve
+        limit = self.daily_budget * (1 - floor)
+        today = self._today()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR IGNORE INTO quota_usage VALUES (?, 0)", (today,))
+            updated = conn.execute(
+                "UPDATE quota_usage SET units = units + ?"
+                " WHERE day = ? AND units + ? <= ?",
+                (cost, today, cost, limit),
+            ).rowcount
+        if not updated:
+            with self._condition:
+                self.rejected += 1
+            raise QuotaExhausted(
+                f"Daily YouTube quota budget too low for {method_id} ({cost} units); "
+                f"{self.remaining()} of {self.daily_budget} units left"
+            )
+
+    def _refund_daily(self, cost: int) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE quota_usage SET units = MAX(units - ?, 0) WHERE day = ?",
+                (cost, self._today()),
+            )
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.usage_path, timeout=30)
+
+
+_scheduler: Optional[QuotaScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_quota_scheduler() -> QuotaScheduler:
+    """Returns the process-wide quota scheduler."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = QuotaScheduler()
+        return _scheduler
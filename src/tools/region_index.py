@@ -0,0 +1,177 @@
+import os
+import string
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.tools.metadata_cache import PART_TTLS
+
+DEFAULT_INDEX_PATH = os.getenv(
+    "PLAI_REGION_INDEX_PATH", os.path.join(".plai_cache", "regions.npz")
+)
+
+# Every two-letter code gets a bit, so any ISO 3166-1 alpha-2 region fits
+REGION_BITS = 26 * 26
+WORDS = (REGION_BITS + 63) // 64
+
+_ALL_REGIONS = np.full(WORDS, np.iinfo(np.uint64).max, dtype=np.uint64)
+
+
+def region_bit(region_code: str) -> int:
+    """Bit of a two-letter region code, e.g. ``"US"``."""
+    code = region_code.strip().upper()
+    if len(code) != 2 or any(c not in string.ascii_uppercase for c in code):
+        raise ValueError(f"Invalid region code: {region_code!r}")
+    return (ord(code[0]) - ord("A")) * 26 + ord(code[1]) - ord("A")
+
+
+def region_mask(region_codes: Iterable[str]) -> np.ndarray:
+    """Bitset with the bits of ``region_codes`` set."""
+    mask = np.zeros(WORDS, dtype=np.uint64)
+    for code in region_codes:
+        bit = region_bit(code)
+        mask[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+    return mask
+
+
+class RegionIndex:
+    """
+    Per-video region bitsets built from ``contentDetails.regionRestriction``.
+
+    Each video stores the regions it can be played in and the regions that
+    block it explicitly, so availability for any set of regions is a few
+    vectorized bitwise operations. The index is saved as ``.npz`` and reused
+    by later runs until entries exceed the contentDetails TTL.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_INDEX_PATH,
+        ttl: float = PART_TTLS["contentDetails"],
+    ):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self.video_ids = np.empty(0, dtype="<U16")
+        self.playable = np.empty((0, WORDS), dtype=np.uint64)
+        self.blocked = np.empty((0, WORDS), dtype=np.uint64)
+        self.indexed_at = np.empty(0, dtype=np.float64)
+        self._load()
+
+    def missing(self, video_ids: Iterable[str]) -> List[str]:
+        """Returns the videos that are not indexed or are stale."""
+        now = time.time()
+        with self._lock:
+            return [
+                video_id
+                for video_id in dict.fromkeys(video_ids)
+                if video_id not in self._rows
+                or now - self.indexed_at[self._rows[video_id]] > self.ttl
+            ]
+
+    def update(self, videos: Dict[str, dict]) -> None:
+        """Indexes video resources that include ``contentDetails``."""
+        if not videos:
+            return
+        count = len(videos)
+        playable = np.empty((count, WORDS), dtype=np.uint64)
+        blocked = np.zeros((count, WORDS), dtype=np.uint64)
+        for i, video in enumerate(videos.values()):
+            restriction = video["contentDetails"].get("regionRestriction", {})
+            allowed = restriction.get("allowed", [])
+            playable[i] = region_mask(allowed) if allowed else _ALL_REGIONS
+            if restriction.get("blocked"):
+                blocked[i] = region_mask(restriction["blocked"])
+        playable &= ~blocked
+
+        with self._lock:
+            for video_id in videos:
+                self._rows.setdefault(video_id, len(self._rows))
+            self._grow(len(self._rows))
+            rows = np.array([self._rows[video_id] for video_id in videos])
+            self.video_ids[rows] = list(videos)
+            self.playable[rows] = playable
+            self.blocked[rows] = blocked
+            self.indexed_at[rows] = time.time()
+            self._save()
+
+    def rows(self, video_ids: List[str]) -> np.ndarray:
+        """Index rows of ``video_ids``; -1 for videos not indexed."""
+        with self._lock:
+            return np.array(
+                [self._rows.get(video_id, -1) for video_id in video_ids],
+                dtype=np.intp,
+            )
+
+    def playable_in(
+        self, rows: np.ndarray, region_codes: Iterable[str], mode: str = "all"
+    ) -> np.ndarray:
+        """
+        Whether each row plays in all (``mode="all"``) or any
+        (``mode="any"``) of ``region_codes``.
+        """
+        mask = region_mask(region_codes)
+        hits = self.playable[rows] & mask
+        if mode == "all":
+            return (hits == mask).all(axis=1)
+        if mode == "any":
+            return (hits != 0).any(axis=1)
+        raise ValueError(f"Unknown mode {mode!r}; expected 'all' or 'any'")
+
+    def blocked_in(self, rows: np.ndarray, region_code: str) -> np.ndarray:
+        """Whether each row is explicitly blocked in ``region_code``."""
+        mask = region_mask([region_code])
+        return ((self.blocked[rows] & mask) != 0).any(axis=1)
+
+    def _grow(self, size: int) -> None:
+        extra = size - len(self.video_ids)
+        if extra <= 0:
+            return
+        self.video_ids = np.concatenate(
+            (self.video_ids, np.empty(extra, dtype=self.video_ids.dtype))
+        )
+        self.playable = np.vstack((self.playable, np.zeros((extra, WORDS), np.uint64)))
+        self.blocked = np.vstack((self.blocked, np.zeros((extra, WORDS), np.uint64)))
+        self.indexed_at = np.concatenate((self.indexed_at, np.zeros(extra)))
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with np.load(self.path) as data:
+            self.video_ids = data["video_ids"]
+            self.playable = data["playable"]
+            self.blocked = data["blocked"]
+            self.indexed_at = data["indexed_at"]
+        self._rows = {str(video_id): i for i, video_id in enumerate(self.video_ids)}
+
+    def _save(self) -> None:
+        # Written to a temporary file first so readers never see a partial file
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(
+                f,
+                video_ids=self.video_ids,
+                playable=self.playable,
+                blocked=self.blocked,
+                indexed_at=self.indexed_at,
+            )
+        os.replace(tmp_path, self.path)
+
+
+_region_index: Optional[RegionIndex] = None
+_region_index_lock = threading.Lock()
+
+
+def get_region_index() -> RegionIndex:
+    """Returns the process-wide region index."""
+    global _region_index
+    with _region_index_lock:
+        if _region_index is None:
+            _region_index = RegionIndex()
+        return _region_index
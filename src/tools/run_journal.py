@@ -0,0 +1,138 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from typing import Dict, Iterable, Optional
+
+DEFAULT_JOURNAL_PATH = os.getenv(
+    "PLAI_JOURNAL_PATH", os.path.join(".plai_cache", "journal.sqlite3")
+)
+# Identifies the crew run whose playlist writes are journaled
+RUN_ID_ENV = "PLAI_RUN_ID"
+
+PENDING = "pending"
+DONE = "done"
+
+
+def current_run_id() -> Optional[str]:
+    """Returns the run being journaled, or None when journaling is off."""
+    return os.getenv(RUN_ID_ENV) or None
+
+
+class RunJournal:
+    """
+    Write-ahead journal of playlist writes, keyed by run, task and operation.
+
+    Tools record an operation as pending before calling the API and as done,
+    with its result, once it succeeds. A replayed run reads the journal and
+    skips operations that are done; pending ones may or may not have reached
+    YouTube and are reconciled against the playlist by the tools.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS operations ("
+                " run_id TEXT NOT NULL,"
+                " task TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " result TEXT,"
+                " updated_at REAL NOT NULL,"
+                " PRIMARY KEY (run_id, task, key))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                " run_id TEXT PRIMARY KEY, started_at REAL NOT NULL)"
+            )
+            # Crew task IDs (new in every process) of the runs that used them
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS run_tasks ("
+                " task_id TEXT PRIMARY KEY, run_id TEXT NOT NULL)"
+            )
+
+    def start_run(self, run_id: Optional[str] = None) -> str:
+        """Registers a new run and returns its ID."""
+        run_id = run_id or uuid.uuid4().hex
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?)", (run_id, time.time())
+            )
+        return run_id
+
+    def record_tasks(self, run_id: str, task_ids: Iterable[str]) -> None:
+        """Records which run the crew tasks with ``task_ids`` belong to."""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO run_tasks VALUES (?, ?)",
+                [(str(task_id), run_id) for task_id in task_ids],
+            )
+
+    def run_for_task(self, task_id: str) -> Optional[str]:
+        """Returns the run a crew task ID was recorded for, if any."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT run_id FROM run_tasks WHERE task_id = ?", (str(task_id),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def entries(self, run_id: str, task: str) -> Dict[str, dict]:
+        """
+        Returns every operation of a run's task by key.
+
+        Each entry has its ``status``, ``result`` and ``updated_at``: for a
+        pending operation, when it was first begun.
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT key, status, result, updated_at FROM operations"
+                " WHERE run_id = ? AND task = ?",
+                (run_id, task),
+            ).fetchall()
+        return {
+            key: {
+                "status": status,
+                "result": json.loads(result) if result else None,
+                "updated_at": updated_at,
+            }
+            for key, status, result, updated_at in rows
+        }
+
+    def begin(self, run_id: str, task: str, keys: Iterable[str]) -> None:
+        """Records operations as pending unless they are already journaled."""
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO operations VALUES (?, ?, ?, ?, NULL, ?)",
+                [(run_id, task, key, PENDING, now) for key in keys],
+            )
+
+    def complete(self, run_id: str, task: str, key: str, result: dict) -> None:
+        """Records an operation as done with its result."""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO operations VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, task, key, DONE, json.dumps(result), time.time()),
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+
+_journal: Optional[RunJournal] = None
+_journal_lock = threading.Lock()
+
+
+def get_journal() -> RunJournal:
+    """Returns the process-wide run journal."""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = RunJournal()
+        return _journal
@@ -0,0 +1,141 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import closing
+from typing import Optional
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "PLAI_SEARCH_CACHE_PATH", os.path.join(".plai_cache", "search.sqlite3")
+)
+DEFAULT_TTL_SECONDS = 6 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+# Bumped when the stored entry format changes, so old entries are never read
+KEY_VERSION = 2
+
+
+def normalize_query(query: str) -> str:
+    """Case-folds a query and sorts its whitespace-separated tokens."""
+    return " ".join(sorted(unicodedata.normalize("NFKC", query).casefold().split()))
+
+
+def search_key(params: dict, page: int) -> str:
+    """Cache key for page ``page`` (from 0) of a ``search().list`` call."""
+    return json.dumps(
+        [
+            KEY_VERSION,
+            normalize_query(params.get("q", "")),
+            (params.get("relevanceLanguage") or "").lower(),
+            params.get("videoCategoryId") or "",
+            params.get("maxResults"),
+            page,
+        ]
+    )
+
+
+class SearchCache:
+    """
+    Persistent cache of search result pages with a TTL and an LRU bound.
+
+    Queries differing only in case, whitespace or word order share entries,
+    so callers store the exact query with each page: a page token is only
+    valid for the query string that returned it. Hit and miss counts since
+    startup are available from ``stats()``.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_pages ("
+                " key TEXT PRIMARY KEY,"
+                " response TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " used_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS search_pages_used_at"
+                " ON search_pages (used_at)"
+            )
+
+    def get(self, key: str) -> Optional[dict]:
+        """Returns a fresh cached entry, or None."""
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT response, fetched_at FROM search_pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.ttl_seconds:
+                conn.execute(
+                    "UPDATE search_pages SET used_at = ? WHERE key = ?", (now, key)
+                )
+                self.hits += 1
+                return json.loads(row[0])
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: dict) -> None:
+        """Stores an entry, evicting the least recently used over the bound."""
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO search_pages VALUES (?, ?, ?, ?)",
+                (key, json.dumps(response), now, now),
+            )
+            conn.execute(
+                "DELETE FROM search_pages WHERE fetched_at < ?",
+                (now - self.ttl_seconds,),
+            )
+            conn.execute(
+                "DELETE FROM search_pages WHERE key IN ("
+                " SELECT key FROM search_pages ORDER BY used_at DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self) -> dict:
+        """Returns hit and miss counters and the number of stored pages."""
+        with closing(self._connect()) as conn:
+            (entries,) = conn.execute("SELECT COUNT(*) FROM search_pages").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def clear(self) -> None:
+        """Removes every cached page and resets the counters."""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM search_pages")
+            self.hits = self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+
+_search_cache: Optional[SearchCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """Returns the process-wide search cache."""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache()
+        return _search_cache
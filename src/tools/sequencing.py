@@ -0,0 +1,149 @@
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.tools.camelot import COMPATIBILITY_TABLE, UNKNOWN_KEY, key_codes
+from src.tools.track_table import TrackTable
+
+# Seconds the optimizer may spend on one playlist
+DEFAULT_TIME_BUDGET = 0.3
+# Share of the budget spent on greedy constructions before 2-opt
+GREEDY_BUDGET_SHARE = 0.25
+# Score given to a pair when either track lacks the feature
+NEUTRAL_SCORE = 0.5
+
+# BPM difference upper bounds and their scores, loosest last
+BPM_STEPS = ((5, 1.0), (10, 0.8), (20, 0.6))
+BPM_FLOOR = 0.4
+
+
+def pair_scores(table: TrackTable, first, second) -> Dict[str, np.ndarray]:
+    """
+    Scores the transitions from rows ``first`` to rows ``second``.
+
+    The row arrays broadcast against each other, so adjacent pairs and all
+    pairs use the same code. Returns ``key``, ``bpm``, ``energy`` and
+    ``overall`` arrays with the values ``TransitionAnalysisTool`` reports.
+    """
+    # Camelot index of every row; missing keys (-1) pick the UNKNOWN_KEY entry
+    keys = np.append(key_codes(table.vocab["key"]), UNKNOWN_KEY)[table.codes["key"]]
+    bpms = table.column("bpm")
+    energies = table.column("energy")
+
+    key = COMPATIBILITY_TABLE[keys[first], keys[second]]
+
+    bpm_diff = np.abs(bpms[first] - bpms[second])
+    bpm = np.select(
+        [bpm_diff <= limit for limit, _ in BPM_STEPS],
+        [score for _, score in BPM_STEPS],
+        BPM_FLOOR,
+    )
+    bpm = np.where((bpms[first] != 0) & (bpms[second] != 0), bpm, NEUTRAL_SCORE)
+
+    energy = 1.0 - np.abs(energies[first] - energies[second]) / 2
+    known_energy = (energies[first] != 0) & (energies[second] != 0)
+    energy = np.where(known_energy, energy, NEUTRAL_SCORE)
+
+    return {
+        "key": key,
+        "bpm": bpm,
+        "energy": energy,
+        "overall": (key + bpm + energy) / 3,
+    }
+
+
+def transition_matrices(tracks) -> Dict[str, np.ndarray]:
+    """Scores every ordered pair of tracks (a table or dicts) as N × N matrices."""
+    table = TrackTable.of(tracks)
+    rows = np.arange(len(table))
+    return pair_scores(table, rows[:, None], rows[None, :])
+
+
+def order_score(overall: np.ndarray, order) -> float:
+    """Mean overall score of the adjacent pairs of ``order``."""
+    order = np.asarray(order)
+    if len(order) < 2:
+        return 0.0
+    return float(overall[order[:-1], order[1:]].mean())
+
+
+def optimize_sequence(
+    overall: np.ndarray, time_budget: float = DEFAULT_TIME_BUDGET
+) -> Tuple[List[int], float]:
+    """
+    Finds a track order with a high mean transition score.
+
+    Builds greedy nearest-neighbour paths from several starting tracks, then
+    improves the best one (or the given order, if better) with 2-opt until
+    no move helps or ``time_budget`` seconds have passed. Returns the order
+    as indices into ``overall`` and its score.
+    """
+    n = len(overall)
+    if n < 3:
+        order = list(range(n))
+        return order, order_score(overall, order)
+
+    deadline = time.perf_counter() + time_budget
+    cost = 1.0 - overall
+
+    best = np.arange(n)
+    best_cost = _path_cost(cost, best)
+    greedy_deadline = time.perf_counter() + time_budget * GREEDY_BUDGET_SHARE
+    starts = np.random.default_rng(0).permutation(n)
+    for start in starts:
+        candidate = _nearest_neighbour(cost, int(start))
+        candidate_cost = _path_cost(cost, candidate)
+        if candidate_cost < best_cost:
+            best, best_cost = candidate, candidate_cost
+        if time.perf_counter() > greedy_deadline:
+            break
+
+    order = _two_opt(cost, best, deadline)
+    return order.tolist(), order_score(overall, order)
+
+
+def _path_cost(cost: np.ndarray, order: np.ndarray) -> float:
+    return float(cost[order[:-1], order[1:]].sum())
+
+
+def _nearest_neighbour(cost: np.ndarray, start: int) -> np.ndarray:
+    n = len(cost)
+    order = np.empty(n, dtype=np.intp)
+    visited = np.zeros(n, dtype=bool)
+    current = start
+    for step in range(n):
+        order[step] = current
+        visited[current] = True
+        if step < n - 1:
+            current = int(np.argmin(np.where(visited, np.inf, cost[current])))
+    return order
+
+
+def _two_opt(cost: np.ndarray, order: np.ndarray, deadline: float) -> np.ndarray:
+    # A zero-cost dummy node closes the path into a tour, so reversals that
+    # touch either end of the path need no special cases
+    n = len(order)
+    padded = np.zeros((n + 1, n + 1))
+    padded[:n, :n] = cost
+    tour = np.concatenate(([n], order))
+    m = n + 1
+
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(1, m - 1):
+            following = np.roll(tour, -1)
+            edges = padded[tour, following]
+            a, b = tour[i - 1], tour[i]
+            c, e = tour[i + 1 :], following[i + 1 :]
+            # Reversing tour[i..j] swaps edges (a, b), (c, e) for (a, c), (b, e)
+            delta = padded[a, c] + padded[b, e] - edges[i - 1] - edges[i + 1 :]
+            j = int(np.argmin(delta))
+            if delta[j] < -1e-12:
+                j += i + 1
+                tour[i : j + 1] = tour[i : j + 1][::-1]
+                improved = True
+            if time.perf_counter() > deadline:
+                break
+    return tour[1:]
@@ -0,0 +1,201 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Numeric track fields and the exact types each column accepts; other values
+# (e.g. a year given as a string, or a bool) are kept as extras
+INTEGER = frozenset({int, np.int64})
+NUMBER = INTEGER | {float, np.float64}
+NUMERIC_COLUMNS = {
+    "bpm": NUMBER,
+    "energy": NUMBER,
+    "duration_seconds": NUMBER,
+    "year": INTEGER,
+}
+TEXT = frozenset({str})
+# String fields stored as codes into a per-table vocabulary
+CATEGORICAL_COLUMNS = ("key", "language")
+MODELED = {"title", "genres", *NUMERIC_COLUMNS, *CATEGORICAL_COLUMNS}
+
+
+@dataclass
+class TrackTable:
+    """
+    Columnar form of the track dicts the playlist tools exchange.
+
+    Numeric fields are NumPy columns with a presence mask and a mask of the
+    rows that held ints, so mixed int and float columns convert back exactly;
+    ``key`` and ``language`` are int32 codes into a vocabulary (-1 when
+    missing) and ``genres`` is a CSR layout: the genre codes of row ``i`` are
+    ``genre_codes[genre_offsets[i]:genre_offsets[i + 1]]``. Fields the
+    table does not model are kept per row in ``extras``, so ``to_dicts``
+    gives back the original tracks.
+    """
+
+    titles: np.ndarray
+    numeric: Dict[str, np.ndarray]
+    present: Dict[str, np.ndarray]
+    integral: Dict[str, np.ndarray]
+    codes: Dict[str, np.ndarray]
+    vocab: Dict[str, List[str]]
+    genre_offsets: np.ndarray
+    genre_codes: np.ndarray
+    genre_vocab: List[str]
+    has_genres: np.ndarray
+    extras: List[Optional[dict]]
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    @classmethod
+    def of(cls, tracks) -> "TrackTable":
+        """Returns ``tracks`` if it already is a table, else converts it."""
+        return tracks if isinstance(tracks, cls) else cls.from_dicts(tracks)
+
+    @classmethod
+    def from_dicts(cls, tracks: Iterable[dict]) -> "TrackTable":
+        """Builds a table from track dicts, one column at a time."""
+        tracks = list(tracks)
+        extras = [
+            {name: value for name, value in track.items() if name not in MODELED}
+            for track in tracks
+        ]
+
+        def column(name: str, types: frozenset, item_types=None) -> tuple:
+            values = [track.get(name) for track in tracks]
+            ok = np.array([type(value) in types for value in values], dtype=bool)
+            if item_types is not None:
+                ok &= np.array(
+                    [
+                        keep and all(type(item) in item_types for item in value)
+                        for value, keep in zip(values, ok)
+                    ],
+                    dtype=bool,
+                )
+            # Values of other types are kept untouched as extras
+            for i in np.flatnonzero(~ok).tolist():
+                if name in tracks[i]:
+                    extras[i][name] = values[i]
+            return values, ok
+
+        titles, has_title = column("title", TEXT)
+
+        numeric, present, integral = {}, {}, {}
+        for name, types in NUMERIC_COLUMNS.items():
+            values, ok = column(name, types)
+            integral[name] = ok & np.array(
+                [type(value) in INTEGER for value in values], dtype=bool
+            )
+            values = [value if keep else 0 for value, keep in zip(values, ok)]
+            numeric[name] = np.array(values, dtype=_numeric_dtype(values, ok))
+            present[name] = ok
+
+        codes, vocab = {}, {}
+        for name in CATEGORICAL_COLUMNS:
+            values, ok = column(name, TEXT)
+            labels: Dict[str, int] = {}
+            codes[name] = np.array(
+                [
+                    labels.setdefault(value, len(labels)) if keep else -1
+                    for value, keep in zip(values, ok)
+                ],
+                dtype=np.int32,
+            )
+            vocab[name] = list(labels)
+
+        genres, has_genres = column("genres", frozenset({list}), TEXT)
+        genre_vocab: Dict[str, int] = {}
+        genre_codes = [
+            genre_vocab.setdefault(genre, len(genre_vocab))
+            for names, keep in zip(genres, has_genres)
+            if keep
+            for genre in names
+        ]
+        lengths = [len(names) if keep else 0 for names, keep in zip(genres, has_genres)]
+
+        return cls(
+            titles=np.array(
+                [title if keep else None for title, keep in zip(titles, has_title)],
+                dtype=object,
+            ),
+            numeric=numeric,
+            present=present,
+            integral=integral,
+            codes=codes,
+            vocab=vocab,
+            genre_offsets=np.concatenate(([0], np.cumsum(lengths, dtype=np.int64))),
+            genre_codes=np.array(genre_codes, dtype=np.int32),
+            genre_vocab=list(genre_vocab),
+            has_genres=has_genres,
+            extras=[extra or None for extra in extras],
+        )
+
+    def to_dicts(self) -> List[dict]:
+        """Converts the table back to track dicts."""
+        columns = {
+            name: [
+                int(value) if is_int else value
+                for value, is_int in zip(values.tolist(), self.integral[name].tolist())
+            ]
+            for name, values in self.numeric.items()
+        }
+        labels = {
+            name: [self.vocab[name][code] if code >= 0 else None for code in codes]
+            for name, codes in self.codes.items()
+        }
+        offsets = self.genre_offsets.tolist()
+        genres = [self.genre_vocab[code] for code in self.genre_codes.tolist()]
+
+        tracks = []
+        for i in range(len(self)):
+            track = {} if self.titles[i] is None else {"title": self.titles[i]}
+            for name in NUMERIC_COLUMNS:
+                if self.present[name][i]:
+                    track[name] = columns[name][i]
+            for name in CATEGORICAL_COLUMNS:
+                if labels[name][i] is not None:
+                    track[name] = labels[name][i]
+            if self.has_genres[i]:
+                track["genres"] = genres[offsets[i] : offsets[i + 1]]
+            track.update(self.extras[i] or {})
+            tracks.append(track)
+        return tracks
+
+    def column(self, name: str, fill=0) -> np.ndarray:
+        """A numeric column with ``fill`` where the field is missing."""
+        values = self.numeric[name]
+        return np.where(self.present[name], values, np.asarray(fill, values.dtype))
+
+    def take(self, rows) -> "TrackTable":
+        """A new table with ``rows``, in that order."""
+        rows = np.asarray(rows, dtype=np.intp)
+        starts = self.genre_offsets[:-1][rows]
+        lengths = self.genre_offsets[1:][rows] - starts
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        # Index of every kept genre code in the source genre_codes
+        flat = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return TrackTable(
+            titles=self.titles[rows],
+            numeric={name: values[rows] for name, values in self.numeric.items()},
+            present={name: mask[rows] for name, mask in self.present.items()},
+            integral={name: mask[rows] for name, mask in self.integral.items()},
+            codes={name: codes[rows] for name, codes in self.codes.items()},
+            vocab=self.vocab,
+            genre_offsets=offsets.astype(np.int64),
+            genre_codes=self.genre_codes[flat],
+            genre_vocab=self.genre_vocab,
+            has_genres=self.has_genres[rows],
+            extras=[self.extras[row] for row in rows.tolist()],
+        )
+
+    def genre_rows(self) -> np.ndarray:
+        """Row of every entry of ``genre_codes``."""
+        return np.repeat(np.arange(len(self)), np.diff(self.genre_offsets))
+
+
+def _numeric_dtype(values: list, present: np.ndarray) -> type:
+    # Integer columns stay integer so totals format exactly as before
+    if all(type(v) in INTEGER for v, ok in zip(values, present) if ok):
+        return np.int64
+    return np.float64
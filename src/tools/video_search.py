@@ -0,0 +1,130 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from src.tools.async_runtime import run_blocking
+from src.tools.search_cache import SearchCache, get_search_cache, search_key
+from src.tools.youtube_service import execute
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PAGE_SIZE = 10
+MUSIC_CATEGORY_ID = "10"
+
+_DONE = object()
+
+
+def search_params(query: str, filters: dict) -> dict:
+    """Builds ``search().list`` parameters for a query and tool filters."""
+    params = {
+        "part": "snippet",
+        "q": query,
+        "type": "video",
+        "maxResults": SEARCH_PAGE_SIZE,
+        "videoCategoryId": MUSIC_CATEGORY_ID,
+    }
+    if "language" in filters:
+        params["relevanceLanguage"] = filters["language"]
+    return params
+
+
+def search_pages(
+    youtube,
+    query: str,
+    filters: dict,
+    max_pages: int = 1,
+    cache: Optional[SearchCache] = None,
+) -> Iterator[dict]:
+    """
+    Yields up to ``max_pages`` search responses, following ``nextPageToken``.
+
+    Pages are served from the search cache when a fresh copy exists. A cached
+    page may have been fetched for a variant of ``query`` (other case or word
+    order); its next page is then requested with that variant, which is the
+    query its ``nextPageToken`` belongs to.
+    """
+    cache = cache or get_search_cache()
+    params = search_params(query, filters)
+    for page in range(max_pages):
+        key = search_key(params, page)
+        entry = cache.get(key)
+        if entry is None:
+            response = execute(youtube.search().list(**params))
+            cache.put(key, {"q": params["q"], "response": response})
+        else:
+            response = entry["response"]
+            params["q"] = entry["q"]
+        yield response
+        if not response.get("nextPageToken"):
+            return
+        params["pageToken"] = response["nextPageToken"]
+
+
+async def aiter_search(
+    youtube,
+    queries: List[str],
+    filters: dict,
+    max_pages_per_query: int = 1,
+    errors: Optional[Dict[str, str]] = None,
+) -> AsyncIterator[dict]:
+    """
+    Runs several searches concurrently and yields each video once.
+
+    Every query runs as a task, and videos are yielded as soon as the page
+    containing them arrives. A video found by several queries is reported
+    for the first one that returned it. Failed queries are logged and, when
+    ``errors`` is given, recorded there. Closing the iterator early cancels
+    the searches still running.
+    """
+    queries = list(dict.fromkeys(queries))
+    pages: asyncio.Queue = asyncio.Queue()
+
+    async def run(query: str) -> None:
+        try:
+            responses = search_pages(youtube, query, filters, max_pages_per_query)
+            while True:
+                response = await run_blocking(next, responses, None)
+                if response is None:
+                    break
+                await pages.put((query, response))
+        except Exception as e:
+            logger.warning("Search for %r failed: %s", query, e)
+            await pages.put((query, e))
+        finally:
+            await pages.put((query, _DONE))
+
+    tasks = [asyncio.create_task(run(query)) for query in queries]
+    seen = set()
+    try:
+        pending = len(tasks)
+        while pending:
+            query, page = await pages.get()
+            if page is _DONE:
+                pending -= 1
+            elif isinstance(page, Exception):
+                if errors is not None:
+                    errors[query] = str(page)
+            else:
+                for video in _new_videos(page, query, seen):
+                    yield video
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _new_videos(page: dict, query: str, seen: set) -> Iterator[dict]:
+    for item in page.get("items", []):
+        video_id = item["id"]["videoId"]
+        if video_id not in seen:
+            seen.add(video_id)
+            yield _format_item(item, query)
+
+
+def _format_item(item: dict, query: str) -> dict:
+    return {
+        "video_id": item["id"]["videoId"],
+        "title": item["snippet"]["title"],
+        "description": item["snippet"]["description"],
+        "thumbnail": item["snippet"]["thumbnails"]["default"]["url"],
+        "query": query,
+    }
@@ -0,0 +1,127 @@
+import os
+import pickle
+import threading
+from typing import Dict, Optional
+
+from google.auth.transport.requests import Request
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build
+
+from src.tools.http_transport import get_http_pool
+from src.tools.quota import get_quota_scheduler
+
+SCOPES = ["https://www.googleapis.com/auth/youtube.force-ssl"]
+TOKEN_PATH = "token.pickle"
+CLIENT_SECRETS_PATH = "client_secrets.json"
+# Overrides the API endpoint, e.g. to point the tools at a local stand-in
+API_BASE_URL_ENV = "PLAI_YOUTUBE_API_BASE_URL"
+
+
+class YouTubeServiceCache:
+    """
+    Process-wide cache of YouTube API clients and OAuth credentials.
+
+    Each client is built once, from the discovery document bundled with
+    googleapiclient rather than one fetched over the network. Credentials
+    are read from ``token.pickle`` once and refreshed only when they have
+    expired.
+    """
+
+    def __init__(
+        self,
+        token_path: str = TOKEN_PATH,
+        client_secrets_path: str = CLIENT_SECRETS_PATH,
+    ):
+        self.token_path = token_path
+        self.client_secrets_path = client_secrets_path
+        self._lock = threading.RLock()
+        self._credentials = None
+        self._services: Dict[str, object] = {}
+
+    def get_service(self, api_key: Optional[str] = None):
+        """Returns the OAuth client, or an API-key client when ``api_key`` is set."""
+        with self._lock:
+            if api_key:
+                key = f"key:{api_key}"
+                if key not in self._services:
+                    self._services[key] = self._build(developerKey=api_key)
+                return self._services[key]
+
+            credentials = self.get_credentials()
+            if "oauth" not in self._services:
+                self._services["oauth"] = self._build(credentials=credentials)
+            return self._services["oauth"]
+
+    def get_credentials(self):
+        """Returns valid OAuth credentials, refreshing or logging in if needed."""
+        with self._lock:
+            if self._credentials is None and os.path.exists(self.token_path):
+                # Token file stores the user's access and refresh tokens
+                with open(self.token_path, "rb") as token:
+                    self._credentials = pickle.load(token)
+
+            creds = self._credentials
+            if creds and creds.valid:
+                return creds
+
+            # If there are no valid credentials available, let the user log in
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(
+                    self.client_secrets_path, SCOPES
+                )
+                creds = flow.run_local_server(port=0)
+                # A new login invalidates clients built with the old credentials
+                self._services.pop("oauth", None)
+
+            # Save the credentials for the next run
+            with open(self.token_path, "wb") as token:
+                pickle.dump(creds, token)
+            self._credentials = creds
+            return creds
+
+    def use_credentials(self, credentials) -> None:
+        """Uses ``credentials`` for the OAuth client instead of ``token.pickle``."""
+        with self._lock:
+            self._services.pop("oauth", None)
+            self._credentials = credentials
+
+    def clear(self) -> None:
+        """Drops every cached client and the in-memory credentials."""
+        with self._lock:
+            self._services.clear()
+            self._credentials = None
+
+    @staticmethod
+    def _build(**kwargs):
+        base_url = os.getenv(API_BASE_URL_ENV)
+        if base_url:
+            kwargs["client_options"] = {"api_endpoint": base_url}
+        return build("youtube", "v3", static_discovery=True, **kwargs)
+
+
+_service_cache = YouTubeServiceCache()
+
+
+def get_youtube_service(api_key: Optional[str] = None):
+    """Returns the process-wide YouTube client."""
+    return _service_cache.get_service(api_key)
+
+
+def get_service_cache() -> YouTubeServiceCache:
+    """Returns the process-wide client cache."""
+    return _service_cache
+
+
+def execute(request, **kwargs):
+    """
+    Executes an API request once the quota scheduler admits it.
+
+    Every YouTube call goes through here. The request borrows a keep-alive
+    transport from the shared pool, since httplib2 connections are not
+    thread-safe and the clients are shared.
+    """
+    get_quota_scheduler().acquire(request.methodId)
+    with get_http_pool().acquire(request.http) as http:
+        return request.execute(http=http, **kwargs)
@@ -1,23 +1,42 @@
-import os
-import pickle
-from typing import List, Type
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Type, Union
 
 from crewai_tools import BaseTool
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from pydantic import BaseModel, Field
 
+from src.tools.async_runtime import AsyncToolMixin, run_blocking, run_sync
+from src.tools.metadata_cache import MAX_IDS_PER_REQUEST, fetch_videos
+from src.tools.playlist_insert import PlaylistBulkInserter
+from src.tools.run_journal import DONE, PENDING, current_run_id, get_journal
+from src.tools.video_search import aiter_search
+from src.tools.youtube_service import execute, get_youtube_service
+
+# Video resource parts VideoMetadataTool consumes
+METADATA_PARTS = ["snippet", "contentDetails", "statistics"]
+
+# Allowed difference between the local clock and YouTube's publishedAt when
+# matching a playlist to a create that may have landed
+PUBLISHED_AT_SKEW_SECONDS = 120
+
 
 class VideoSearchInput(BaseModel):
     """Input schema for video search."""
 
-    query: str = Field(..., description="Search query string")
+    query: Optional[str] = Field(None, description="Search query string")
     filters: dict = Field(
         ...,
         description="Dictionary of filters including language, content rating, duration, and view count thresholds",
     )
+    queries: Optional[List[str]] = Field(
+        None, description="Several search queries to run at once, e.g. genre variants"
+    )
+    max_pages_per_query: int = Field(
+        1, description="Result pages to fetch per query (10 videos per page)"
+    )
 
 
 class PlaylistCreateInput(BaseModel):
@@ -43,86 +62,83 @@ class PlaylistAddInput(BaseModel):
 class VideoMetadataInput(BaseModel):
     """Input schema for video metadata retrieval."""
 
-    video_id: str = Field(..., description="ID of the video to fetch metadata for")
+    video_id: Optional[str] = Field(
+        None, description="ID of the video to fetch metadata for"
+    )
+    video_ids: Optional[List[str]] = Field(
+        None, description="IDs of several videos to fetch metadata for in one call"
+    )
 
 
-class YouTubeBaseTool(BaseTool):
+class YouTubeBaseTool(AsyncToolMixin, BaseTool):
     """Base class for YouTube tools with authentication handling"""
 
     def _get_youtube_service(self):
-        """Gets authenticated YouTube service."""
-        creds = None
-        # Token file stores the user's access and refresh tokens
-        if os.path.exists("token.pickle"):
-            with open("token.pickle", "rb") as token:
-                creds = pickle.load(token)
-
-        # If there are no valid credentials available, let the user log in
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    "client_secrets.json",
-                    ["https://www.googleapis.com/auth/youtube.force-ssl"],
-                )
-                creds = flow.run_local_server(port=0)
-
-            # Save the credentials for the next run
-            with open("token.pickle", "wb") as token:
-                pickle.dump(creds, token)
-
-        # Build and return the YouTube service
-        return build("youtube", "v3", credentials=creds)
+        """Gets the shared, authenticated YouTube service."""
+        return get_youtube_service()
 
 
 class VideoSearchTool(YouTubeBaseTool):
     name: str = "Search YouTube Videos"
-    description: str = "Search for videos on YouTube based on query and filters"
+    description: str = (
+        "Search for videos on YouTube based on query and filters. Pass queries "
+        "to run several searches at once; results are deduplicated."
+    )
     args_schema: Type[BaseModel] = VideoSearchInput
 
-    def _run(self, query: str, filters: dict) -> dict:
-        try:
-            youtube = self._get_youtube_service()
-
-            # Construir los parámetros de búsqueda
-            search_params = {
-                "part": "snippet",
-                "q": query,
-                "type": "video",
-                "maxResults": 10,  # Ajusta según necesites
-                "videoCategoryId": "10",  # ID para música
-            }
+    def _run(
+        self,
+        query: Optional[str] = None,
+        filters: Optional[dict] = None,
+        queries: Optional[List[str]] = None,
+        max_pages_per_query: int = 1,
+    ) -> dict:
+        # Crews call tools synchronously; the searches still run as tasks on
+        # the shared event loop
+        return run_sync(self._arun(query, filters, queries, max_pages_per_query))
 
-            # Aplicar filtros adicionales si existen
-            if "language" in filters:
-                search_params["relevanceLanguage"] = filters["language"]
-
-            # Realizar la búsqueda
-            search_response = youtube.search().list(**search_params).execute()
-
-            # Procesar resultados
-            videos = []
-            for item in search_response.get("items", []):
-                video_id = item["id"]["videoId"]
-                videos.append(
-                    {
-                        "video_id": video_id,
-                        "title": item["snippet"]["title"],
-                        "description": item["snippet"]["description"],
-                        "thumbnail": item["snippet"]["thumbnails"]["default"]["url"],
-                    }
+    async def _arun(
+        self,
+        query: Optional[str] = None,
+        filters: Optional[dict] = None,
+        queries: Optional[List[str]] = None,
+        max_pages_per_query: int = 1,
+    ) -> dict:
+        try:
+            queries = list(queries or []) + ([query] if query else [])
+            if not queries:
+                return {"status": "error", "message": "query or queries is required"}
+
+            errors = {}
+            videos = [
+                video
+                async for video in aiter_search(
+                    self._get_youtube_service(),
+                    queries,
+                    filters or {},
+                    max_pages_per_query=max(max_pages_per_query, 1),
+                    errors=errors,
                 )
-
-            return {
-                "status": "success",
-                "video_ids": [v["video_id"] for v in videos],
-                "videos": videos,
-            }
+            ]
+            return self._search_result(queries, videos, errors)
 
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
+    @staticmethod
+    def _search_result(queries: List[str], videos: List[dict], errors: dict) -> dict:
+        if len(errors) == len(set(queries)):
+            return {"status": "error", "message": "; ".join(errors.values())}
+
+        result = {
+            "status": "success",
+            "video_ids": [v["video_id"] for v in videos],
+            "videos": videos,
+        }
+        if errors:
+            result["errors"] = errors
+        return result
+
 
 class PlaylistCreateTool(YouTubeBaseTool):
     name: str = "Create YouTube Playlist"
@@ -130,6 +146,8 @@ class PlaylistCreateTool(YouTubeBaseTool):
         "Creates a new YouTube playlist with the specified title and description"
     )
     args_schema: Type[BaseModel] = PlaylistCreateInput
+    # Crew task whose playlist is journaled, so a replay does not create another
+    journal_task: str = "create_playlist_task"
 
     def _run(
         self,
@@ -141,9 +159,21 @@ class PlaylistCreateTool(YouTubeBaseTool):
         try:
             youtube = self._get_youtube_service()
 
+            run_id = current_run_id()
+            key = _playlist_key(title, description, privacy_status)
+            if run_id:
+                journaled = self._journaled_playlist(
+                    youtube, run_id, key, title, description
+                )
+                if journaled:
+                    return journaled
+                get_journal().begin(run_id, self.journal_task, [key])
+
             # Si no se proporciona channel_id, obtener lista de canales
             if not channel_id:
-                channels = youtube.channels().list(part="snippet", mine=True).execute()
+                channels = execute(
+                    youtube.channels().list(part="snippet", mine=True)
+                )
 
                 if not channels["items"]:
                     return {"status": "error", "message": "No channels found"}
@@ -151,9 +181,8 @@ class PlaylistCreateTool(YouTubeBaseTool):
                 # Usar el primer canal por defecto
                 channel_id = channels["items"][0]["id"]
 
-            playlist_insert_response = (
-                youtube.playlists()
-                .insert(
+            playlist_insert_response = execute(
+                youtube.playlists().insert(
                     part="snippet,status",
                     body={
                         "snippet": {
@@ -164,98 +193,245 @@ class PlaylistCreateTool(YouTubeBaseTool):
                         "status": {"privacyStatus": privacy_status},
                     },
                 )
-                .execute()
             )
 
-            return {
-                "playlist_id": playlist_insert_response["id"],
-                "channel_id": channel_id,
-                "url": f"https://www.youtube.com/playlist?list={playlist_insert_response['id']}",
-                "status": "success",
-            }
+            result = self._playlist_result(playlist_insert_response["id"], channel_id)
+            if run_id:
+                get_journal().complete(run_id, self.journal_task, key, result)
+            return result
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
+    def _journaled_playlist(
+        self, youtube, run_id: str, key: str, title: str, description: str
+    ) -> Optional[dict]:
+        """Returns the playlist this run already created with these arguments."""
+        entry = get_journal().entries(run_id, self.journal_task).get(key)
+        if not entry:
+            return None
+        if entry["status"] == DONE:
+            return {**entry["result"], "replayed": True}
+
+        # The insert may have succeeded before the run failed; only a playlist
+        # with the same title and description published since can be it
+        since, page_token = entry["updated_at"] - PUBLISHED_AT_SKEW_SECONDS, None
+        while True:
+            playlists = execute(
+                youtube.playlists().list(
+                    part="snippet", mine=True, maxResults=50, pageToken=page_token
+                )
+            )
+            for playlist in playlists.get("items", []):
+                snippet = playlist["snippet"]
+                if (
+                    snippet["title"] == title
+                    and snippet.get("description", "") == description
+                    and _published_at(snippet) >= since
+                ):
+                    result = self._playlist_result(
+                        playlist["id"], snippet.get("channelId")
+                    )
+                    get_journal().complete(run_id, self.journal_task, key, result)
+                    return {**result, "replayed": True}
+            page_token = playlists.get("nextPageToken")
+            if not page_token:
+                return None
+
+    @staticmethod
+    def _playlist_result(playlist_id: str, channel_id: str) -> dict:
+        return {
+            "playlist_id": playlist_id,
+            "channel_id": channel_id,
+            "url": f"https://www.youtube.com/playlist?list={playlist_id}",
+            "status": "success",
+        }
+
 
 class PlaylistAddTool(YouTubeBaseTool):
     name: str = "Add Videos to Playlist"
-    description: str = "Add videos to an existing YouTube playlist"
+    description: str = (
+        "Add videos to an existing YouTube playlist, keeping the given order"
+    )
     args_schema: Type[BaseModel] = PlaylistAddInput
+    # Crew task whose inserts are journaled, so a replay skips finished ones
+    journal_task: str = "add_videos_task"
 
     def _run(self, playlist_id: str, video_ids: List[str]) -> dict:
         try:
-            youtube = self._get_youtube_service()
-            results = []
-
-            # Añadir logging para debug
-            print(f"Adding videos to playlist {playlist_id}")
-            print(f"Video IDs to add: {video_ids}")
-
-            for video_id in video_ids:
-                try:
-                    response = (
-                        youtube.playlistItems()
-                        .insert(
-                            part="snippet",
-                            body={
-                                "snippet": {
-                                    "playlistId": playlist_id,
-                                    "resourceId": {
-                                        "kind": "youtube#video",
-                                        "videoId": video_id,
-                                    },
-                                }
-                            },
-                        )
-                        .execute()
-                    )
-                    results.append(response)
-                    print(f"Successfully added video {video_id}")
-                except Exception as e:
-                    print(f"Error adding video {video_id}: {str(e)}")
+            inserter = PlaylistBulkInserter(self._get_youtube_service())
+            run_id = current_run_id()
+            if run_id:
+                outcome = self._insert_journaled(
+                    inserter, run_id, playlist_id, video_ids
+                )
+            else:
+                outcome = inserter.insert(playlist_id, video_ids)
 
             return {
                 "status": "success",
-                "added_videos": len(results),
+                "added_videos": outcome["added"],
                 "playlist_id": playlist_id,
-                "failed_videos": len(video_ids) - len(results),
+                "failed_videos": outcome["failed"],
+                "already_added": outcome["existing"],
+                "reordered": outcome["reordered"],
+                "results": outcome["results"],
             }
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
+    def _insert_journaled(
+        self,
+        inserter: PlaylistBulkInserter,
+        run_id: str,
+        playlist_id: str,
+        video_ids: List[str],
+    ) -> dict:
+        journal, task = get_journal(), self.journal_task
+        keys = _item_keys(playlist_id, video_ids)
+        entries = journal.entries(run_id, task)
+
+        existing = {
+            index: entries[key]["result"]["playlist_item_id"]
+            for index, key in enumerate(keys)
+            if entries.get(key, {}).get("status") == DONE
+        }
+        pending = [
+            index
+            for index, key in enumerate(keys)
+            if entries.get(key, {}).get("status") == PENDING
+        ]
+        if pending:
+            # Inserts that may have landed before the run failed
+            found = self._find_items(
+                inserter, playlist_id, video_ids, pending, existing
+            )
+            for index, item_id in found.items():
+                result = {"playlist_item_id": item_id}
+                journal.complete(run_id, task, keys[index], result)
+            existing.update(found)
+
+        journal.begin(
+            run_id, task, [key for i, key in enumerate(keys) if i not in existing]
+        )
+
+        def on_added(index, outcome):
+            result = {"playlist_item_id": outcome.playlist_item_id}
+            journal.complete(run_id, task, keys[index], result)
+
+        return inserter.insert(playlist_id, video_ids, existing, on_added)
+
+    @staticmethod
+    def _find_items(inserter, playlist_id, video_ids, pending, existing) -> dict:
+        claimed = set(existing.values())
+        unclaimed: Dict[str, List[str]] = {}
+        for item_id, video_id in inserter.playlist_items(playlist_id):
+            if item_id not in claimed:
+                unclaimed.setdefault(video_id, []).append(item_id)
+        return {
+            index: unclaimed[video_ids[index]].pop(0)
+            for index in pending
+            if unclaimed.get(video_ids[index])
+        }
+
 
 class VideoMetadataTool(YouTubeBaseTool):
     name: str = "Video Metadata Fetcher"
     description: str = (
         "Fetches detailed video metadata including duration, view count, "
-        "like ratio, comments sentiment, language, and content rating."
+        "like ratio, comments sentiment, language, and content rating. "
+        "Pass video_ids to fetch many videos at once."
     )
     args_schema: Type[BaseModel] = VideoMetadataInput
 
-    def _run(self, video_id: str) -> dict:
-        youtube = self._get_youtube_service()
-
+    def _run(
+        self, video_id: Optional[str] = None, video_ids: Optional[List[str]] = None
+    ) -> dict:
+        if video_ids:
+            # Chunks are requested concurrently on the shared event loop
+            return run_sync(self._arun(video_ids=video_ids))
+        if not video_id:
+            raise Exception("Either video_id or video_ids is required")
+
+        metadata = self.fetch_many([video_id])
+        if isinstance(metadata[video_id], str):
+            raise Exception(f"Video {video_id} not found")
+        return metadata[video_id]
+
+    async def _arun(
+        self, video_id: Optional[str] = None, video_ids: Optional[List[str]] = None
+    ) -> dict:
+        if not video_ids:
+            return await run_blocking(self._run, video_id=video_id)
+
+        # Request every chunk of 50 IDs concurrently
+        unique_ids = list(dict.fromkeys(video_ids))
+        chunks = await asyncio.gather(
+            *(
+                run_blocking(self.fetch_many, unique_ids[i : i + MAX_IDS_PER_REQUEST])
+                for i in range(0, len(unique_ids), MAX_IDS_PER_REQUEST)
+            )
+        )
+        return {video_id: meta for chunk in chunks for video_id, meta in chunk.items()}
+
+    def fetch_many(self, video_ids: List[str]) -> Dict[str, Union[dict, str]]:
+        """
+        Fetches metadata for many videos, keyed by video ID.
+
+        Fresh entries come from the local metadata cache; the rest are
+        requested in chunks of 50 (the API limit) with a partial response, so
+        200 uncached videos cost 4 requests. Videos the API does not return
+        map to an error string.
+        """
         try:
-            video_response = (
-                youtube.videos()
-                .list(part="snippet,contentDetails,statistics", id=video_id)
-                .execute()
+            videos = fetch_videos(
+                self._get_youtube_service(), video_ids, METADATA_PARTS
             )
-
-            if not video_response["items"]:
-                raise Exception(f"Video {video_id} not found")
-
-            video = video_response["items"][0]
-            return {
-                "title": video["snippet"]["title"],
-                "description": video["snippet"]["description"],
-                "duration": video["contentDetails"]["duration"],
-                "viewCount": video["statistics"].get("viewCount", 0),
-                "likeCount": video["statistics"].get("likeCount", 0),
-                "commentCount": video["statistics"].get("commentCount", 0),
-                "language": video["snippet"].get("defaultLanguage", "unknown"),
-                "tags": video["snippet"].get("tags", []),
-                "publishedAt": video["snippet"]["publishedAt"],
-            }
         except HttpError as e:
             raise Exception(f"Failed to fetch video metadata: {str(e)}")
+
+        return {
+            video_id: (
+                self._format_metadata(videos[video_id])
+                if video_id in videos
+                else f"Error: Video {video_id} not found"
+            )
+            for video_id in dict.fromkeys(video_ids)
+        }
+
+    @staticmethod
+    def _format_metadata(video: dict) -> dict:
+        return {
+            "title": video["snippet"]["title"],
+            "description": video["snippet"]["description"],
+            "duration": video["contentDetails"]["duration"],
+            "viewCount": video["statistics"].get("viewCount", 0),
+            "likeCount": video["statistics"].get("likeCount", 0),
+            "commentCount": video["statistics"].get("commentCount", 0),
+            "language": video["snippet"].get("defaultLanguage", "unknown"),
+            "tags": video["snippet"].get("tags", []),
+            "publishedAt": video["snippet"]["publishedAt"],
+        }
+
+
+def _playlist_key(title: str, description: str, privacy_status: str) -> str:
+    # Journal key of a playlist create; a run may create several playlists
+    arguments = json.dumps([title, description, privacy_status])
+    return f"playlist:{hashlib.sha1(arguments.encode()).hexdigest()}"
+
+
+def _published_at(snippet: dict) -> float:
+    # Seconds since the epoch; playlists without the field never match
+    published_at = snippet.get("publishedAt")
+    if not published_at:
+        return float("-inf")
+    return datetime.fromisoformat(published_at.replace("Z", "+00:00")).timestamp()
+
+
+def _item_keys(playlist_id: str, video_ids: List[str]) -> List[str]:
+    # Journal keys for playlist inserts; repeated videos get distinct keys
+    seen: Dict[str, int] = {}
+    keys = []
+    for video_id in video_ids:
+        seen[video_id] = seen.get(video_id, 0) + 1
+        keys.append(f"{playlist_id}:{video_id}:{seen[video_id]}")
+    return keys
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from src.tools.camelot import (
+    COMPATIBILITY_TABLE,
+    UNKNOWN_KEY,
+    camelot_index,
+    camelot_name,
+    compatibility_matrix,
+    key_codes,
+    key_compatibility,
+    normalize_key,
+)
+
+
+@pytest.mark.parametrize(
+    "key, expected",
+    [
+        ("8A", "8A"),
+        ("8a", "8A"),
+        ("08A", "8A"),
+        ("12 B", "12B"),
+        ("1B", "1B"),
+        # Note names map onto the wheel
+        ("Am", "8A"),
+        ("C", "8B"),
+        ("G", "9B"),
+        ("Em", "9A"),
+        ("F", "7B"),
+        ("Dm", "7A"),
+        ("Cm", "5A"),
+    ],
+)
+def test_normalize_key_to_camelot(key, expected):
+    assert camelot_name(normalize_key(key)) == expected
+
+
+@pytest.mark.parametrize(
+    "spellings",
+    [
+        ("Am", "A minor", "a min", "A mi", "A-", "8A"),
+        ("C", "C major", "C maj", "CM", "8B"),
+        ("C#", "Db", "D♭", "C♯ major", "3B"),
+        ("F#m", "Gbm", "F# minor", "G♭ min", "11A"),
+        ("E#", "F"),
+        ("Cb", "B", "1B"),
+        ("Cbm", "Bm", "10A"),
+        ("Bb", "A#", "Bb maj", "6B"),
+    ],
+)
+def test_enharmonic_and_suffix_spellings_agree(spellings):
+    codes = {normalize_key(spelling) for spelling in spellings}
+    assert len(codes) == 1
+    assert UNKNOWN_KEY not in codes
+
+
+def test_am_is_minor_and_capital_m_is_major():
+    assert normalize_key("Am") == camelot_index(8, major=False)
+    assert normalize_key("AM") == camelot_index(11, major=True)
+
+
+@pytest.mark.parametrize("key", [None, "", "13A", "0B", "H", "A dorian", "8C", "#"])
+def test_unrecognised_keys_are_unknown(key):
+    assert normalize_key(key) == UNKNOWN_KEY
+
+
+@pytest.mark.parametrize(
+    "key1, key2, score",
+    [
+        ("8A", "8A", 1.0),
+        ("8A", "9A", 0.9),
+        ("8A", "7A", 0.9),
+        ("12A", "1A", 0.9),
+        ("8A", "8B", 0.9),
+        ("8A", "9B", 0.75),
+        ("8A", "10A", 0.7),
+        ("8A", "3A", 0.4),
+        ("Am", "C", 0.9),
+        ("Am", None, 0.5),
+        ("nonsense", "8A", 0.5),
+    ],
+)
+def test_key_compatibility(key1, key2, score):
+    assert key_compatibility(key1, key2) == score
+    assert key_compatibility(key2, key1) == score
+
+
+def test_compatibility_matrix_is_one_table_lookup():
+    keys = ["Am", "C", "F#m", None, "9B"]
+    codes = key_codes(keys)
+    matrix = compatibility_matrix(codes)
+
+    assert matrix.shape == (len(keys), len(keys))
+    expected = [[key_compatibility(a, b) for b in keys] for a in keys]
+    np.testing.assert_array_equal(matrix, expected)
+    assert not COMPATIBILITY_TABLE.flags.writeable
@@ -0,0 +1,222 @@
+import itertools
+import json
+import random
+import threading
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from src.tools import playlist_insert
+from src.tools.playlist_insert import (
+    InsertOutcome,
+    PlaylistBulkInserter,
+    _longest_increasing,
+)
+
+
+def http_error(status: int, reason: str) -> HttpError:
+    error = {"code": status, "message": reason, "errors": [{"reason": reason}]}
+    content = json.dumps({"error": error}).encode()
+    return HttpError(httplib2.Response({"status": status}), content)
+
+
+class _Request:
+    def __init__(self, call):
+        self._call = call
+
+    def execute(self):
+        return self._call()
+
+
+class FakePlaylistItems:
+    """In-memory ``playlistItems`` resource of a single playlist."""
+
+    def __init__(self, items=(), lost=(), failed=(), scramble=False):
+        self.items = list(items)
+        # Videos whose first insert is applied but answered with a 503, and
+        # videos whose first insert fails with a 503 without being applied
+        self.lost = set(lost)
+        self.failed = set(failed)
+        self.scramble = scramble
+        self.inserts = 0
+        self.updates = 0
+        self._ids = itertools.count()
+        self._random = random.Random(0)
+        self._lock = threading.Lock()
+
+    def playlistItems(self):
+        return self
+
+    def video_ids(self):
+        return [video_id for _, video_id in self.items]
+
+    def list(self, part, playlistId, maxResults, pageToken=None, fields=None):
+        def call():
+            with self._lock:
+                start = int(pageToken or 0)
+                page = self.items[start : start + maxResults]
+                response = {
+                    "items": [
+                        {"id": item_id, "snippet": {"resourceId": {"videoId": v}}}
+                        for item_id, v in page
+                    ],
+                    "pageInfo": {"totalResults": len(self.items)},
+                }
+                if start + maxResults < len(self.items):
+                    response["nextPageToken"] = str(start + maxResults)
+                return response
+
+        return _Request(call)
+
+    def insert(self, part, body):
+        def call():
+            video_id = body["snippet"]["resourceId"]["videoId"]
+            with self._lock:
+                self.inserts += 1
+                if video_id in self.failed:
+                    self.failed.discard(video_id)
+                    raise http_error(503, "backendError")
+                item_id = f"PLI{next(self._ids)}"
+                # Stands in for concurrent requests arriving out of order
+                position = len(self.items)
+                if self.scramble:
+                    position = self._random.randint(max(position - 2, 0), position)
+                self.items.insert(position, (item_id, video_id))
+                if video_id in self.lost:
+                    self.lost.discard(video_id)
+                    raise http_error(503, "backendError")
+                return {"id": item_id}
+
+        return _Request(call)
+
+    def update(self, part, body):
+        def call():
+            with self._lock:
+                self.updates += 1
+                ids = [item_id for item_id, _ in self.items]
+                item = self.items.pop(ids.index(body["id"]))
+                self.items.insert(body["snippet"]["position"], item)
+                return body
+
+        return _Request(call)
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    # No quota scheduler, transport pool or backoff sleeps
+    monkeypatch.setattr(playlist_insert, "execute", lambda request: request.execute())
+    monkeypatch.setattr(playlist_insert, "backoff_delay", lambda attempt: 0.0)
+
+
+def is_increasing_run(values, indices):
+    picked = [values[i] for i in sorted(indices)]
+    return all(a < b for a, b in zip(picked, picked[1:]))
+
+
+def brute_force_lis(values):
+    for size in range(len(values), 0, -1):
+        for combo in itertools.combinations(range(len(values)), size):
+            if is_increasing_run(values, combo):
+                return size
+    return 0
+
+
+def test_longest_increasing_simple_cases():
+    assert _longest_increasing([]) == set()
+    assert _longest_increasing([3]) == {0}
+    assert _longest_increasing([0, 1, 2]) == {0, 1, 2}
+    assert _longest_increasing([0, 5, 1, 2, 3]) == {0, 2, 3, 4}
+    assert len(_longest_increasing([2, 1, 0])) == 1
+
+
+def test_longest_increasing_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(200):
+        values = rng.sample(range(20), rng.randint(1, 8))
+        indices = _longest_increasing(values)
+        assert is_increasing_run(values, indices)
+        assert len(indices) == brute_force_lis(values)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_repair_order_moves_only_items_off_the_longest_run(seed):
+    rng = random.Random(seed)
+    videos = [f"v{i}" for i in range(rng.randint(2, 12))]
+    landed = [(f"PLI{i}", video) for i, video in enumerate(videos)]
+    rng.shuffle(landed)
+    # An unrelated item before them must stay first
+    youtube = FakePlaylistItems([("other", "x")] + landed)
+    placed = [
+        InsertOutcome(video, status="added", playlist_item_id=f"PLI{i}")
+        for i, video in enumerate(videos)
+    ]
+    current = [int(item_id[3:]) for item_id, _ in landed]
+
+    moves = PlaylistBulkInserter(youtube)._repair_order("PL1", placed)
+
+    assert youtube.video_ids() == ["x"] + videos
+    assert moves == youtube.updates == len(videos) - len(_longest_increasing(current))
+
+
+def test_insert_keeps_input_order_when_inserts_land_out_of_order():
+    videos = [f"v{i}" for i in range(15)]
+    youtube = FakePlaylistItems(scramble=True)
+
+    result = PlaylistBulkInserter(youtube, max_workers=4).insert("PL1", videos)
+
+    assert youtube.video_ids() == videos
+    assert result["added"] == len(videos)
+    assert result["reordered"] == youtube.updates
+    assert youtube.inserts == len(videos)
+
+
+def test_insert_adopts_an_item_whose_response_was_lost():
+    youtube = FakePlaylistItems(lost={"b"})
+
+    result = PlaylistBulkInserter(youtube, max_workers=1).insert(
+        "PL1", ["a", "b", "c"]
+    )
+
+    assert youtube.video_ids() == ["a", "b", "c"]
+    assert youtube.inserts == 3
+    outcome = result["results"][1]
+    assert outcome["status"] == "added"
+    assert outcome["attempts"] == 1
+    assert outcome["playlist_item_id"] == youtube.items[1][0]
+
+
+def test_insert_retries_a_server_error_that_did_not_land():
+    youtube = FakePlaylistItems(failed={"b"})
+
+    result = PlaylistBulkInserter(youtube, max_workers=1).insert(
+        "PL1", ["a", "b", "c"]
+    )
+
+    assert youtube.video_ids() == ["a", "b", "c"]
+    assert result["results"][1]["attempts"] == 2
+    assert result["added"] == 3
+
+
+def test_insert_does_not_adopt_an_item_that_was_already_there():
+    youtube = FakePlaylistItems([("old", "b")], failed={"b"})
+
+    result = PlaylistBulkInserter(youtube, max_workers=1).insert("PL1", ["b"])
+
+    outcome = result["results"][0]
+    assert outcome["status"] == "added"
+    assert outcome["playlist_item_id"] != "old"
+    assert youtube.video_ids() == ["b", "b"]
+
+
+def test_existing_items_are_not_inserted_again():
+    youtube = FakePlaylistItems([("PLIa", "a")])
+
+    result = PlaylistBulkInserter(youtube, max_workers=2).insert(
+        "PL1", ["a", "b"], existing={0: "PLIa"}
+    )
+
+    assert youtube.video_ids() == ["a", "b"]
+    assert youtube.inserts == 1
+    assert result["existing"] == 1
+    assert result["added"] == 1
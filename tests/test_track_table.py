@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from src.tools.track_table import TrackTable
+
+TRACKS = [
+    {
+        "title": "One",
+        "bpm": 120,
+        "energy": 0.8,
+        "duration_seconds": 215,
+        "year": 1994,
+        "key": "Am",
+        "language": "English",
+        "genres": ["hip hop", "boom bap"],
+        "video_id": "aaaaaaaaaaa",
+    },
+    {
+        "title": "Two",
+        "bpm": 92.5,
+        "energy": 1,
+        "key": "C",
+        "genres": [],
+    },
+    # Values of unexpected types are kept as they were
+    {"title": "Three", "bpm": True, "year": "1999", "genres": ["rap", 7]},
+    {"bpm": 88, "language": "Spanish", "genres": ["latin"], "notes": {"a": 1}},
+    {},
+]
+
+
+def test_round_trip_gives_back_the_tracks():
+    assert TrackTable.from_dicts(TRACKS).to_dicts() == TRACKS
+
+
+def test_round_trip_keeps_value_types():
+    tracks = TrackTable.from_dicts(TRACKS).to_dicts()
+
+    bpm_types = [type(track.get("bpm")) for track in tracks]
+    assert bpm_types == [int, float, bool, int, type(None)]
+    assert type(tracks[1]["energy"]) is int
+    assert type(tracks[0]["year"]) is int
+    assert tracks[2]["year"] == "1999"
+
+
+def test_float_with_integral_value_stays_float():
+    tracks = TrackTable.from_dicts([{"bpm": 120.0}, {"bpm": 121}]).to_dicts()
+    assert type(tracks[0]["bpm"]) is float
+    assert type(tracks[1]["bpm"]) is int
+
+
+def test_columns():
+    table = TrackTable.from_dicts(TRACKS)
+
+    assert table.numeric["year"].dtype == np.int64
+    assert table.numeric["bpm"].dtype == np.float64
+    np.testing.assert_array_equal(
+        table.present["bpm"], [True, True, False, True, False]
+    )
+    np.testing.assert_array_equal(table.column("bpm"), [120.0, 92.5, 0.0, 88.0, 0.0])
+    keys = [table.vocab["key"][c] if c >= 0 else None for c in table.codes["key"]]
+    assert keys == ["Am", "C", None, None, None]
+    np.testing.assert_array_equal(table.genre_offsets, [0, 2, 2, 2, 3, 3])
+    np.testing.assert_array_equal(table.genre_rows(), [0, 0, 3])
+
+
+@pytest.mark.parametrize(
+    "rows", [[4, 3, 2, 1, 0], [3, 0], [0, 0, 3], [1], [], list(range(len(TRACKS)))]
+)
+def test_take_matches_selecting_dicts(rows):
+    table = TrackTable.from_dicts(TRACKS).take(rows)
+
+    assert len(table) == len(rows)
+    assert table.to_dicts() == [TRACKS[row] for row in rows]
+
+
+def test_take_of_take():
+    table = TrackTable.from_dicts(TRACKS).take([3, 2, 0]).take([2, 0])
+    assert table.to_dicts() == [TRACKS[0], TRACKS[3]]
+
+
+def test_of_reuses_tables():
+    table = TrackTable.from_dicts(TRACKS)
+    assert TrackTable.of(table) is table
+    assert TrackTable.of(TRACKS).to_dicts() == TRACKS
+
+
+def test_empty_table():
+    table = TrackTable.from_dicts([])
+    assert len(table) == 0
+    assert table.to_dicts() == []
+    assert table.take([]).to_dicts() == []